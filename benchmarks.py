@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+# Headless benchmarks for the hot paths of all four games. Every benchmark is seeded, so two
+# runs on the same machine do the same work; results are microseconds per call, best of
+# several repeats. A stored baseline turns the suite into a regression gate: any benchmark
+# slower than the baseline by more than the threshold fails the run.
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+SNAKE_LENGTHS = (10, 100, 300, 550)
+# Space Invaders scales: multiplier -> (screen size, enemy rows, enemies per row, bullet pool)
+INVADER_SCALES = {
+    1: ((800, 600), 3, 8, 64),
+    4: ((1600, 1200), 6, 16, 128),
+    16: ((3200, 2400), 12, 32, 256)
+}
+INVADER_PHASES = ('check_collisions', 'update_enemies', 'draw')
+
+def time_calls(run, calls, repeats, min_time=0.2):
+    """Microseconds per call for each of repeats samples; run() makes calls calls.
+
+    Each sample repeats run() until it has taken at least min_time seconds, so
+    short benchmarks are not lost in timer and scheduler noise.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / elapsed) + 1) if elapsed else loops * 10
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        samples.append((time.perf_counter() - start) * 1e6 / (calls * loops))
+    return samples
+
+def random_positions(count, seed):
+    """Positions from seeded random games, sampled every few plies."""
+    import copy
+    from chess_rules import ChessBoard
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = ChessBoard()
+        for ply in range(100):
+            moves = [((row, col), target)
+                     for row in range(8) for col in range(8)
+                     if board.board[row][col] and board.board[row][col].color == board.current_player
+                     for target in board.get_valid_moves(row, col)]
+            if not moves:
+                break
+            (from_row, from_col), (to_row, to_col) = rng.choice(moves)
+            captured = board.move_piece(from_row, from_col, to_row, to_col)
+            if captured and captured.piece_type == 'king':
+                break
+            if ply % 4 == 3:
+                positions.append(copy.deepcopy(board))
+    return positions[:count]
+
+def bench_chess(repeats, seed):
+    # ChessGame.get_valid_moves is inherited from ChessBoard, which needs no Tk root
+    squares = [(board, row, col)
+               for board in random_positions(200, seed)
+               for row in range(8) for col in range(8) if board.board[row][col]]
+
+    def run():
+        for board, row, col in squares:
+            board.get_valid_moves(row, col)
+
+    return {'chess.get_valid_moves': {'samples': time_calls(run, len(squares), repeats),
+                                      'calls': len(squares)}}
+
+def snake_cycle(width, height):
+    """A closed path through every cell: rows zig-zag over columns 1.., column 0 leads back up."""
+    cycle = []
+    for y in range(height):
+        columns = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+        cycle.extend((x, y) for x in columns)
+    cycle.extend((0, y) for y in range(height - 1, -1, -1))
+    return cycle
+
+def bench_snake(repeats, seed, steps=1000):
+    from snake_3 import SnakeGame
+    results = {}
+    game = SnakeGame(headless=True)
+    cycle = snake_cycle(game.width, game.height)
+    names = {(0, -1): "Up", (0, 1): "Down", (-1, 0): "Left", (1, 0): "Right"}
+    turns = []
+    for i, (x, y) in enumerate(cycle):
+        next_x, next_y = cycle[(i + 1) % len(cycle)]
+        turns.append(names[(next_x - x, next_y - y)])
+
+    for length in SNAKE_LENGTHS:
+        def run():
+            # The snake follows the cycle, so it never dies; food is cleared after each
+            # spawn so it is never eaten and the length stays fixed
+            random.seed(seed)
+            head = length - 1
+            game.snake = [cycle[i] for i in range(head, -1, -1)]
+            game.direction = turns[head - 1]
+            game.food = game.special_food = None
+            game.game_running = True
+            for _ in range(steps):
+                game.next_direction = turns[head]
+                game.move_snake()
+                game.spawn_food()
+                game.food = None
+                head = (head + 1) % len(cycle)
+            if not game.game_running:
+                raise RuntimeError("benchmark snake crashed")
+
+        results[f'snake.move_snake+spawn_food[len={length}]'] = {
+            'samples': time_calls(run, steps, repeats), 'calls': steps}
+    return results
+
+def bench_snake_ladder(repeats, seed, rolls=20000):
+    from snake_2 import SnakeAndLadder
+    rng = random.Random(seed)
+    sequence = [rng.randint(1, 6) for _ in range(rolls)]
+    game = SnakeAndLadder(headless=True)
+
+    def run():
+        game.new_game()
+        for i, roll in enumerate(sequence):
+            game.move_player(1 + i % 2, roll)
+
+    return {'snake_ladder.move_player': {'samples': time_calls(run, rolls, repeats), 'calls': rolls}}
+
+def bench_space_invaders(repeats, seed, frames=600):
+    from spaceinvader2 import FrameProfiler, Game, GameConfig
+    from spaceinvader_tools import simple_bot
+    columns = {phase: 1 + FrameProfiler.PHASES.index(phase) for phase in INVADER_PHASES}
+    results = {}
+    for scale, ((width, height), rows, per_row, pool) in INVADER_SCALES.items():
+        config = GameConfig(SCREEN_WIDTH=width, SCREEN_HEIGHT=height, ENEMY_ROWS=rows,
+                            ENEMIES_PER_ROW=per_row, BULLET_POOL_SIZE=pool)
+        samples = {phase: [] for phase in INVADER_PHASES}
+        entities = []
+        for _ in range(repeats):
+            # The frame profiler already times each phase; only frames of a live game count
+            game = Game(config, headless=True, seed=seed, profile=True, trace=True)
+            while not game.done and game.frame < frames:
+                game.step(simple_bot(game))
+            trace = game.profiler.trace
+            for phase, column in columns.items():
+                samples[phase].append(statistics.fmean(row[column] for row in trace) * 1000)
+            entities.append(statistics.fmean(row[-3] + row[-2] + row[-1] for row in trace))
+        for phase in INVADER_PHASES:
+            results[f'space_invaders.{phase}[x{scale}]'] = {
+                'samples': samples[phase], 'calls': len(trace), 'entities': round(statistics.fmean(entities), 1)}
+    return results
+
+SUITES = {
+    'chess': bench_chess,
+    'snake': bench_snake,
+    'snake_ladder': bench_snake_ladder,
+    'space_invaders': bench_space_invaders
+}
+
+def run_suites(names, repeats, seed):
+    benchmarks = {}
+    for name in names:
+        for benchmark, result in SUITES[name](repeats, seed).items():
+            samples = result.pop('samples')
+            result['us_per_call'] = min(samples)
+            result['median_us'] = statistics.median(samples)
+            benchmarks[benchmark] = result
+            print(f"{benchmark:<50} {result['us_per_call']:10.2f} us  (median {result['median_us']:.2f})", flush=True)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'seed': seed,
+        'benchmarks': benchmarks
+    }
+
+def compare(results, baseline, threshold):
+    """Print each benchmark against the baseline; returns the names that regressed past threshold."""
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        reference = baseline['benchmarks'].get(name)
+        if reference is None:
+            print(f"{name:<50} new")
+            continue
+        change = result['us_per_call'] / reference['us_per_call'] - 1
+        status = "ok"
+        if change > threshold:
+            status = "REGRESSED"
+            regressions.append(name)
+        print(f"{name:<50} {reference['us_per_call']:10.2f} -> {result['us_per_call']:10.2f} us  "
+              f"{change:+7.1%}  {status}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks for all four games")
+    parser.add_argument("suites", nargs='*', metavar="SUITE", help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per benchmark; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fail if a benchmark is slower than its baseline by more than this fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite: {', '.join(unknown)}")
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+    results = run_suites(args.suites or list(SUITES), args.repeats, args.seed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nagainst {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to store one")
\ No newline at end of file
@@ -0,0 +1,336 @@
+import os
+import sys
+import json
+import mmap
+import time
+import heapq
+import random
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from chess_uci import EngineBoard, ZOBRIST, SIDE_KEY, parse_uci_move, move_to_uci
+
+# Position index over archives of games played with the chess1.py rules.
+#
+# An archive is a text file with one game per line, written as coordinate moves ("e2e4 e7e5 ...");
+# blank lines and lines starting with '#' are skipped. Games get consecutive ids in the order
+# they are added. Every position of every game is replayed through ChessBoard and hashed two ways:
+# the full position (Zobrist key, side to move included) and the pawn structure alone.
+#
+# Each kind of hash is stored as sorted segment files, one batch of games per segment, so new
+# archives only ever add segments. A segment is a 16 byte header, then its hashes as sorted
+# uint64s, then the matching game ids as uint32s (native byte order). Lookups memory-map the
+# segments and bisect the hash column directly. compact() merges all segments into one.
+
+MAGIC = b'CPI1'
+HEADER_SIZE = 16
+KINDS = ('position', 'pawns')
+SEGMENT_RECORDS = 2000000
+MANIFEST = 'manifest.json'
+
+def position_key(board):
+    # Same value as EngineBoard.key, computed from scratch so any ChessBoard can be looked up
+    key = SIDE_KEY if board.current_player == 'black' else 0
+    for row in range(8):
+        for col in range(8):
+            piece = board.board[row][col]
+            if piece:
+                key ^= ZOBRIST[piece.color][piece.piece_type][row * 8 + col]
+    return key
+
+def pawn_structure_key(board):
+    key = 0
+    for row in range(8):
+        for col in range(8):
+            piece = board.board[row][col]
+            if piece and piece.piece_type == 'pawn':
+                key ^= ZOBRIST[piece.color]['pawn'][row * 8 + col]
+    return key
+
+def replay_game(moves):
+    """Replay coordinate moves from the start position. Returns the set of position keys, the set
+    of pawn structure keys, and whether every move was legal (replay stops at the first that is not)."""
+    board = EngineBoard()
+    pawns = pawn_structure_key(board)
+    positions, structures = {board.key}, {pawns}
+    for text in moves:
+        move = parse_uci_move(text)
+        if move is None or not board.is_valid_move(*move):
+            return positions, structures, False
+        from_row, from_col, to_row, to_col = move
+        piece = board.board[from_row][from_col]
+        captured = board.board[to_row][to_col]
+        if piece.piece_type == 'pawn':
+            keys = ZOBRIST[piece.color]['pawn']
+            pawns ^= keys[from_row * 8 + from_col] ^ keys[to_row * 8 + to_col]
+        if captured and captured.piece_type == 'pawn':
+            pawns ^= ZOBRIST[captured.color]['pawn'][to_row * 8 + to_col]
+        board.push(move)
+        positions.add(board.key)
+        structures.add(pawns)
+    return positions, structures, True
+
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:4] != MAGIC:
+            raise ValueError(f"{path} is not an index segment")
+        self.count = int.from_bytes(self.data[4:12], sys.byteorder)
+        self.view = memoryview(self.data)
+        self.hashes = self.view[HEADER_SIZE:HEADER_SIZE + 8 * self.count].cast('Q')
+        self.games = self.view[HEADER_SIZE + 8 * self.count:HEADER_SIZE + 12 * self.count].cast('I')
+
+    def lookup(self, key):
+        start = bisect_left(self.hashes, key)
+        stop = bisect_right(self.hashes, key, start)
+        return self.games[start:stop].tolist()
+
+    def records(self):
+        return zip(self.hashes, self.games)
+
+    def close(self):
+        self.hashes.release()
+        self.games.release()
+        self.view.release()
+        self.data.close()
+
+    @staticmethod
+    def write(path, records):
+        """Write (hash, game id) pairs, which must already be sorted, as a segment file."""
+        hashes, games = array('Q'), array('I')
+        for key, game_id in records:
+            hashes.append(key)
+            games.append(game_id)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(MAGIC + len(hashes).to_bytes(8, sys.byteorder) + bytes(HEADER_SIZE - 12))
+            f.write(hashes.tobytes())
+            f.write(games.tobytes())
+        os.replace(path + '.tmp', path)
+        return len(hashes)
+
+class PositionIndex:
+    """Query and incrementally extend an index directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'next_game': 0, 'next_segment': 0, 'archives': [], 'segments': {kind: [] for kind in KINDS}}
+        self.segments = {kind: [Segment(os.path.join(directory, name)) for name in self.manifest['segments'][kind]]
+                         for kind in KINDS}
+
+    def save_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    @property
+    def game_count(self):
+        return self.manifest['next_game']
+
+    def record_count(self, kind='position'):
+        return sum(segment.count for segment in self.segments[kind])
+
+    def flush(self, buffers, staged):
+        """Write the buffers as new segment files, appending (kind, name) to staged."""
+        for kind in KINDS:
+            if not buffers[kind]:
+                continue
+            name = f"{kind}-{self.manifest['next_segment']:05d}.seg"
+            self.manifest['next_segment'] += 1
+            buffers[kind].sort()
+            staged.append((kind, name))
+            Segment.write(os.path.join(self.directory, name),
+                          ((packed >> 32, packed & 0xffffffff) for packed in buffers[kind]))
+            buffers[kind] = []
+
+    def add_archive(self, path):
+        """Index every game in an archive file; returns (games added, games with an illegal move)."""
+        path = os.path.abspath(path)
+        if any(archive['path'] == path for archive in self.manifest['archives']):
+            raise ValueError(f"{path} is already indexed")
+        first_game = game_id = self.manifest['next_game']
+        illegal = 0
+        buffers = {kind: [] for kind in KINDS}
+        # Segments join the manifest only once the whole archive is in, so a failure
+        # part way through leaves the index as it was
+        staged = []
+        try:
+            with open(path) as f:
+                for line in f:
+                    moves = line.split()
+                    if not moves or moves[0].startswith('#'):
+                        continue
+                    positions, structures, legal = replay_game(moves)
+                    illegal += not legal
+                    # Game ids ride in the low 32 bits so one integer sort orders by (hash, game)
+                    buffers['position'].extend(key << 32 | game_id for key in positions)
+                    buffers['pawns'].extend(key << 32 | game_id for key in structures)
+                    game_id += 1
+                    if len(buffers['position']) >= SEGMENT_RECORDS:
+                        self.flush(buffers, staged)
+            self.flush(buffers, staged)
+        except BaseException:
+            for _, name in staged:
+                segment_path = os.path.join(self.directory, name)
+                for leftover in (segment_path, segment_path + '.tmp'):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+            raise
+        for kind, name in staged:
+            self.manifest['segments'][kind].append(name)
+            self.segments[kind].append(Segment(os.path.join(self.directory, name)))
+        self.manifest['archives'].append({'path': path, 'first_game': first_game, 'games': game_id - first_game})
+        self.manifest['next_game'] = game_id
+        self.save_manifest()
+        return game_id - first_game, illegal
+
+    def compact(self):
+        """Merge each kind's segments into a single segment."""
+        for kind in KINDS:
+            segments = self.segments[kind]
+            if len(segments) < 2:
+                continue
+            name = f"{kind}-{self.manifest['next_segment']:05d}.seg"
+            self.manifest['next_segment'] += 1
+            path = os.path.join(self.directory, name)
+            Segment.write(path, heapq.merge(*(segment.records() for segment in segments)))
+            old = self.manifest['segments'][kind]
+            self.manifest['segments'][kind] = [name]
+            self.save_manifest()
+            for segment in segments:
+                segment.close()
+            for old_name in old:
+                os.remove(os.path.join(self.directory, old_name))
+            self.segments[kind] = [Segment(path)]
+
+    def lookup(self, key, kind='position'):
+        """Sorted ids of the games that contain the hash."""
+        games = []
+        for segment in self.segments[kind]:
+            games.extend(segment.lookup(key))
+        return games
+
+    def games_with_position(self, board):
+        return self.lookup(position_key(board), 'position')
+
+    def games_with_pawn_structure(self, board):
+        return self.lookup(pawn_structure_key(board), 'pawns')
+
+    def game_location(self, game_id):
+        """(archive path, game number within the archive) of a game id."""
+        for archive in self.manifest['archives']:
+            if archive['first_game'] <= game_id < archive['first_game'] + archive['games']:
+                return archive['path'], game_id - archive['first_game']
+        raise KeyError(game_id)
+
+    def close(self):
+        for segments in self.segments.values():
+            for segment in segments:
+                segment.close()
+
+def write_random_archive(path, games, plies, seed=0):
+    """Write random legal games, for benchmarking."""
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for _ in range(games):
+            board = EngineBoard()
+            moves = []
+            for _ in range(plies):
+                own = [(r, c) for r in range(8) for c in range(8)
+                       if board.board[r][c] and board.board[r][c].color == board.current_player]
+                rng.shuffle(own)
+                for row, col in own:
+                    targets = board.get_valid_moves(row, col)
+                    if targets:
+                        to_row, to_col = rng.choice(targets)
+                        break
+                else:
+                    break
+                captured = board.board[to_row][to_col]
+                board.move_piece(row, col, to_row, to_col)
+                moves.append(move_to_uci((row, col, to_row, to_col)))
+                if captured and captured.piece_type == 'king':
+                    break
+            f.write(' '.join(moves) + '\n')
+
+def benchmark(directory, games=40000, plies=80, lookups=200000, seed=0):
+    index = PositionIndex(directory)
+    if index.game_count < games:
+        archive = os.path.join(directory, f"random-{index.game_count}.txt")
+        start = time.perf_counter()
+        write_random_archive(archive, games - index.game_count, plies, seed)
+        print(f"wrote {games - index.game_count} random games in {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        index.add_archive(archive)
+        print(f"indexed in {time.perf_counter() - start:.1f} s")
+    print(f"{index.game_count} games, {index.record_count('position')} position postings "
+          f"in {len(index.segments['position'])} segments, {index.record_count('pawns')} pawn structure postings")
+
+    # Half the probes hit stored positions, half are random keys that almost surely miss
+    rng = random.Random(seed)
+    segments = index.segments['position']
+    keys = []
+    for _ in range(lookups):
+        if rng.random() < 0.5:
+            segment = rng.choice(segments)
+            keys.append(segment.hashes[rng.randrange(segment.count)])
+        else:
+            keys.append(rng.getrandbits(64))
+    times = []
+    found = 0
+    start = time.perf_counter()
+    for key in keys:
+        t = time.perf_counter()
+        found += len(index.lookup(key))
+        times.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    times.sort()
+    print(f"{lookups} lookups in {elapsed:.2f} s: {lookups / elapsed:.0f} lookups/s, "
+          f"p50 {times[len(times) // 2] * 1e6:.1f} us, p99 {times[int(len(times) * 0.99)] * 1e6:.1f} us, "
+          f"{found} postings returned")
+    index.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Position index for chess game archives")
+    parser.add_argument("--dir", default="position_index", help="index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="index archive files")
+    add.add_argument("archives", nargs='+')
+    commands.add_parser("compact", help="merge segments")
+    query = commands.add_parser("query", help="list games that reached a position")
+    query.add_argument("fen")
+    query.add_argument("--pawns", action="store_true", help="match the pawn structure only")
+    bench = commands.add_parser("bench", help="build a random index and time lookups")
+    bench.add_argument("--games", type=int, default=40000)
+    bench.add_argument("--plies", type=int, default=80)
+    bench.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.dir, args.games, args.plies, args.lookups)
+        sys.exit()
+    index = PositionIndex(args.dir)
+    if args.command == "add":
+        for archive in args.archives:
+            added, illegal = index.add_archive(archive)
+            print(f"{archive}: {added} games ({illegal} stopped at an illegal move)")
+    elif args.command == "compact":
+        index.compact()
+    else:
+        board = EngineBoard(args.fen)
+        start = time.perf_counter()
+        games = index.games_with_pawn_structure(board) if args.pawns else index.games_with_position(board)
+        elapsed = time.perf_counter() - start
+        for game_id in games[:20]:
+            path, number = index.game_location(game_id)
+            print(f"game {game_id}: {path} #{number}")
+        print(f"{len(games)} games in {elapsed * 1000:.2f} ms")
+    index.close()
\ No newline at end of file
@@ -0,0 +1,185 @@
+import asyncio
+import argparse
+import json
+import random
+import time
+from chess_rules import ChessBoard
+from chess_server import ChessServer
+
+# Drives many concurrent games against a chess server. Both sides of every game are played
+# by this process: games are spread over a fixed pool of connections, each client keeps a
+# mirror ChessBoard and answers every move event with a random legal reply.
+
+class LoadClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 1
+        self.pending = {}
+        self.listeners = {}  # game id -> callback(event)
+
+    async def request(self, **message):
+        request_id = self.next_id
+        self.next_id += 1
+        message['id'] = request_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+        return await future
+
+    async def read_loop(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if 'event' in message:
+                listener = self.listeners.get(message['game'])
+                if listener:
+                    listener(message)
+            else:
+                self.pending.pop(message['id']).set_result(message)
+
+class LoadGame:
+    def __init__(self, white, black, rng, max_plies, latencies):
+        self.clients = {'white': white, 'black': black}
+        self.board = ChessBoard()
+        self.rng = rng
+        self.max_plies = max_plies
+        self.latencies = latencies
+        self.plies = 0
+        self.game_id = None
+        self.finished = asyncio.get_running_loop().create_future()
+
+    async def start(self):
+        reply = await self.clients['white'].request(op='new')
+        self.game_id = reply['game']
+        await self.clients['black'].request(op='join', game=self.game_id)
+        for client in set(self.clients.values()):
+            client.listeners[self.game_id] = self.on_event
+
+    def random_move(self):
+        moves = []
+        for row in range(8):
+            for col in range(8):
+                piece = self.board.board[row][col]
+                if piece and piece.color == self.board.current_player:
+                    moves.extend(((row, col), target) for target in self.board.get_valid_moves(row, col))
+        return self.rng.choice(moves) if moves else None
+
+    async def play(self):
+        await self.start()
+        self.send_move()
+        await self.finished
+        await self.clients['white'].request(op='close', game=self.game_id)
+        return self.plies
+
+    def send_move(self):
+        move = self.random_move()
+        if move is None or self.plies >= self.max_plies:
+            self.finish()
+            return
+        client = self.clients[self.board.current_player]
+        asyncio.ensure_future(self.timed_move(client, *move))
+
+    async def timed_move(self, client, source, target):
+        start = time.perf_counter()
+        reply = await client.request(op='move', game=self.game_id, **{'from': source, 'to': target})
+        self.latencies.append(time.perf_counter() - start)
+        if not reply['ok']:
+            self.finished.set_exception(RuntimeError(reply['error']))
+
+    def on_event(self, event):
+        # With both sides on one connection the event arrives once; with two it arrives twice
+        if self.finished.done() or event['ply'] <= self.plies:
+            return
+        (from_row, from_col), (to_row, to_col) = event['from'], event['to']
+        self.board.move_piece(from_row, from_col, to_row, to_col)
+        self.plies += 1
+        if event['winner']:
+            self.finish()
+        else:
+            self.send_move()
+
+    def finish(self):
+        if not self.finished.done():
+            self.finished.set_result(self.plies)
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def run_load(host, port, games, connections, max_plies=80, seed=0):
+    clients = []
+    for _ in range(connections):
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        clients.append(LoadClient(reader, writer))
+    readers = [asyncio.ensure_future(client.read_loop()) for client in clients]
+
+    rng = random.Random(seed)
+    latencies = []
+    sessions = [
+        LoadGame(clients[(2 * i) % connections], clients[(2 * i + 1) % connections], rng, max_plies, latencies)
+        for i in range(games)
+    ]
+    start = time.perf_counter()
+    plies = await asyncio.gather(*(session.play() for session in sessions))
+    elapsed = time.perf_counter() - start
+
+    stats = await clients[0].request(op='stats')
+    for client in clients:
+        client.writer.close()
+        await client.writer.wait_closed()
+    await asyncio.gather(*readers)
+
+    latencies.sort()
+    total = sum(plies)
+    return {
+        'games': games,
+        'connections': connections,
+        'moves': total,
+        'seconds': elapsed,
+        'moves_per_sec': total / elapsed if elapsed else 0.0,
+        'rtt_p50_ms': percentile(latencies, 0.50) * 1000,
+        'rtt_p99_ms': percentile(latencies, 0.99) * 1000,
+        'server_validation_p99_us': stats['validation_p99_us']
+    }
+
+async def run_scaling(host, port, game_counts, connections, max_plies, seed):
+    server = None
+    if host is None:
+        # No server given: host one in-process on an ephemeral port
+        server = await asyncio.start_server(ChessServer().handle_connection, '127.0.0.1', 0, limit=1 << 20)
+        host, port = server.sockets[0].getsockname()[:2]
+    results = []
+    try:
+        for games in game_counts:
+            result = await run_load(host, port, games, connections, max_plies, seed)
+            results.append(result)
+            print(f"{games:6d} games  {connections:4d} conns  {result['moves']:8d} moves  "
+                  f"{result['moves_per_sec']:9.0f} moves/s  "
+                  f"rtt p50 {result['rtt_p50_ms']:7.2f} ms  p99 {result['rtt_p99_ms']:7.2f} ms  "
+                  f"validate p99 {result['server_validation_p99_us']:6.1f} us")
+    finally:
+        if server:
+            server.close()
+            await server.wait_closed()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for chess_server.py")
+    parser.add_argument("--host", help="server to target (default: start one in-process)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, nargs='+', default=[10, 100, 1000],
+                        help="concurrent game counts to measure")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--max-plies", type=int, default=80, help="stop each game after this many moves")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    results = asyncio.run(run_scaling(args.host, args.port, args.games, args.connections,
+                                      args.max_plies, args.seed))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
\ No newline at end of file
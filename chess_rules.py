@@ -0,0 +1,143 @@
+class ChessPiece:
+    def __init__(self, color, piece_type):
+        self.color = color
+        self.piece_type = piece_type
+        self.has_moved = False
+
+class ChessBoard:
+    """Board state and move rules, with no user interface attached."""
+
+    def __init__(self):
+        self.current_player = 'white'
+        self.board = [[None for _ in range(8)] for _ in range(8)]
+        self.setup_pieces()
+
+    def setup_pieces(self):
+        piece_order = ['rook', 'knight', 'bishop', 'queen', 'king', 'bishop', 'knight', 'rook']
+        
+        for col in range(8):
+            # Set up pawns
+            self.board[1][col] = ChessPiece('black', 'pawn')
+            self.board[6][col] = ChessPiece('white', 'pawn')
+            
+            # Set up other pieces
+            self.board[0][col] = ChessPiece('black', piece_order[col])
+            self.board[7][col] = ChessPiece('white', piece_order[col])
+
+    def get_valid_moves(self, row, col):
+        piece = self.board[row][col]
+        if not piece:
+            return []
+        
+        valid_moves = []
+        
+        if piece.piece_type == 'pawn':
+            direction = -1 if piece.color == 'white' else 1
+            
+            # Forward move
+            if 0 <= row + direction < 8 and not self.board[row + direction][col]:
+                valid_moves.append((row + direction, col))
+                
+                # Initial two-square move
+                if not piece.has_moved and 0 <= row + 2*direction < 8 and not self.board[row + 2*direction][col]:
+                    valid_moves.append((row + 2*direction, col))
+            
+            # Captures
+            for c in [col - 1, col + 1]:
+                if 0 <= c < 8 and 0 <= row + direction < 8:
+                    target = self.board[row + direction][c]
+                    if target and target.color != piece.color:
+                        valid_moves.append((row + direction, c))
+        
+        elif piece.piece_type == 'rook':
+            # Horizontal and vertical moves
+            for direction in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                r, c = row + direction[0], col + direction[1]
+                while 0 <= r < 8 and 0 <= c < 8:
+                    target = self.board[r][c]
+                    if not target:
+                        valid_moves.append((r, c))
+                    elif target.color != piece.color:
+                        valid_moves.append((r, c))
+                        break
+                    else:
+                        break
+                    r += direction[0]
+                    c += direction[1]
+        
+        elif piece.piece_type == 'knight':
+            moves = [
+                (-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                (1, -2), (1, 2), (2, -1), (2, 1)
+            ]
+            for move in moves:
+                r, c = row + move[0], col + move[1]
+                if 0 <= r < 8 and 0 <= c < 8:
+                    target = self.board[r][c]
+                    if not target or target.color != piece.color:
+                        valid_moves.append((r, c))
+        
+        elif piece.piece_type == 'bishop':
+            # Diagonal moves
+            for direction in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
+                r, c = row + direction[0], col + direction[1]
+                while 0 <= r < 8 and 0 <= c < 8:
+                    target = self.board[r][c]
+                    if not target:
+                        valid_moves.append((r, c))
+                    elif target.color != piece.color:
+                        valid_moves.append((r, c))
+                        break
+                    else:
+                        break
+                    r += direction[0]
+                    c += direction[1]
+        
+        elif piece.piece_type == 'queen':
+            # Combine rook and bishop moves
+            directions = [
+                (0, 1), (0, -1), (1, 0), (-1, 0),
+                (1, 1), (1, -1), (-1, 1), (-1, -1)
+            ]
+            for direction in directions:
+                r, c = row + direction[0], col + direction[1]
+                while 0 <= r < 8 and 0 <= c < 8:
+                    target = self.board[r][c]
+                    if not target:
+                        valid_moves.append((r, c))
+                    elif target.color != piece.color:
+                        valid_moves.append((r, c))
+                        break
+                    else:
+                        break
+                    r += direction[0]
+                    c += direction[1]
+        
+        elif piece.piece_type == 'king':
+            # All adjacent squares
+            for i in [-1, 0, 1]:
+                for j in [-1, 0, 1]:
+                    if i == 0 and j == 0:
+                        continue
+                    r, c = row + i, col + j
+                    if 0 <= r < 8 and 0 <= c < 8:
+                        target = self.board[r][c]
+                        if not target or target.color != piece.color:
+                            valid_moves.append((r, c))
+        
+        return valid_moves
+
+    def is_valid_move(self, from_row, from_col, to_row, to_col):
+        piece = self.board[from_row][from_col]
+        if not piece or piece.color != self.current_player:
+            return False
+        return (to_row, to_col) in self.get_valid_moves(from_row, from_col)
+
+    def move_piece(self, from_row, from_col, to_row, to_col):
+        """Move a piece (assumed valid), hand the turn over and return any captured piece."""
+        captured = self.board[to_row][to_col]
+        self.board[to_row][to_col] = self.board[from_row][from_col]
+        self.board[from_row][from_col] = None
+        self.board[to_row][to_col].has_moved = True
+        self.current_player = 'black' if self.current_player == 'white' else 'white'
+        return captured
\ No newline at end of file
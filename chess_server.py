@@ -0,0 +1,202 @@
+import asyncio
+import argparse
+import json
+import time
+from collections import deque
+from chess_rules import ChessBoard
+
+# Protocol: one JSON object per line in each direction.
+#   {"id": 1, "op": "new"}                                  -> {"id": 1, "ok": true, "game": 7, "color": "white"}
+#   {"id": 2, "op": "join", "game": 7}                      -> {"id": 2, "ok": true, "game": 7, "color": "black"}
+#   {"id": 3, "op": "moves", "game": 7, "from": [6, 4]}     -> {"id": 3, "ok": true, "moves": [[5, 4], [4, 4]]}
+#   {"id": 4, "op": "move", "game": 7, "from": [6, 4], "to": [4, 4]} -> {"id": 4, "ok": true}
+#   {"id": 5, "op": "close", "game": 7}                     -> {"id": 5, "ok": true}
+#   {"id": 6, "op": "stats"}                                -> {"id": 6, "ok": true, "games": ..., ...}
+# Every accepted move is also pushed to both players as
+#   {"event": "move", "game": 7, "ply": 1, "from": [6, 4], "to": [4, 4], "next": "black", "winner": null}
+# Only a seated player may close a game; when one does, or disconnects, the other seat gets
+#   {"event": "closed", "game": 7}
+# A failed request gets {"id": ..., "ok": false, "error": "..."}.
+# A client that stops reading is disconnected once its unsent output passes the high-water mark.
+
+class RequestError(Exception):
+    pass
+
+class GameRoom:
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.board = ChessBoard()
+        self.players = {}  # color -> Connection
+        self.winner = None
+        self.plies = 0
+
+class Connection:
+    def __init__(self, writer, high_water):
+        self.writer = writer
+        self.transport = writer.transport
+        self.high_water = high_water
+        self.games = set()
+        self.dropped = False
+
+    def send(self, message):
+        """Queue a message; returns False if the peer is too far behind and has been dropped."""
+        if self.dropped:
+            return False
+        # Events for the other seat are written without a drain. A peer that stops reading
+        # would buffer them without limit, and skipping one would desync its board, so it
+        # is disconnected instead; its handler then closes its games as usual
+        if self.transport.get_write_buffer_size() > self.high_water:
+            self.dropped = True
+            self.transport.abort()
+            return False
+        self.writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+        return True
+
+class ChessServer:
+    """Hosts many concurrent games; all state lives in memory as ChessBoard objects."""
+
+    def __init__(self, latency_window=10000, high_water=256 * 1024):
+        self.rooms = {}
+        self.next_game_id = 1
+        self.high_water = high_water
+        self.slow_peers_dropped = 0
+        self.moves_validated = 0
+        self.validation_times = deque(maxlen=latency_window)
+
+    async def handle_connection(self, reader, writer):
+        connection = Connection(writer, self.high_water)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = self.handle_request(connection, request)
+                except RequestError as e:
+                    response = {'ok': False, 'error': str(e)}
+                except (ValueError, KeyError, TypeError, IndexError) as e:
+                    response = {'ok': False, 'error': f"bad request: {e}"}
+                if isinstance(request, dict) and 'id' in request:
+                    response['id'] = request['id']
+                if not connection.send(response):
+                    break
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.slow_peers_dropped += connection.dropped
+            for game_id in list(connection.games):
+                self.close_game(game_id, connection)
+            writer.close()
+
+    def handle_request(self, connection, request):
+        op = request['op']
+        if op == 'new':
+            room = GameRoom(self.next_game_id)
+            self.next_game_id += 1
+            self.rooms[room.game_id] = room
+            return self.seat(connection, room, 'white')
+        if op == 'stats':
+            return dict(ok=True, **self.stats())
+        if op not in ('join', 'moves', 'move', 'close'):
+            raise RequestError(f"unknown op {op!r}")
+
+        room = self.rooms.get(request['game'])
+        if room is None:
+            raise RequestError(f"no such game {request['game']}")
+        if op == 'join':
+            return self.seat(connection, room, 'black')
+        if op == 'moves':
+            row, col = self.square(request, 'from')
+            return {'ok': True, 'moves': room.board.get_valid_moves(row, col)}
+        if op == 'move':
+            return self.make_move(connection, room, self.square(request, 'from'), self.square(request, 'to'))
+        if op == 'close':
+            if connection not in room.players.values():
+                raise RequestError(f"not a player in game {room.game_id}")
+            self.close_game(room.game_id, connection)
+            return {'ok': True}
+
+    @staticmethod
+    def square(request, key):
+        # Checked here because negative indexes would otherwise address the board from the far side
+        square = request[key]
+        if not (isinstance(square, list) and len(square) == 2 and
+                all(isinstance(i, int) and not isinstance(i, bool) and 0 <= i < 8 for i in square)):
+            raise RequestError(f"{key!r} must be [row, col] with both in 0..7")
+        return square
+
+    def seat(self, connection, room, color):
+        if color in room.players:
+            raise RequestError(f"{color} is already taken in game {room.game_id}")
+        room.players[color] = connection
+        connection.games.add(room.game_id)
+        return {'ok': True, 'game': room.game_id, 'color': color}
+
+    def make_move(self, connection, room, source, target):
+        board = room.board
+        if room.winner:
+            raise RequestError("game is over")
+        if room.players.get(board.current_player) is not connection:
+            raise RequestError(f"not your turn ({board.current_player} to move)")
+        from_row, from_col = source
+        to_row, to_col = target
+
+        start = time.perf_counter()
+        valid = board.is_valid_move(from_row, from_col, to_row, to_col)
+        self.validation_times.append(time.perf_counter() - start)
+        self.moves_validated += 1
+        if not valid:
+            raise RequestError("illegal move")
+
+        mover = board.current_player
+        captured = board.move_piece(from_row, from_col, to_row, to_col)
+        room.plies += 1
+        # The rules core has no check detection, so a game ends when a king is taken
+        if captured and captured.piece_type == 'king':
+            room.winner = mover
+
+        event = {
+            'event': 'move', 'game': room.game_id, 'ply': room.plies, 'from': source, 'to': target,
+            'next': board.current_player, 'winner': room.winner
+        }
+        for player in set(room.players.values()):
+            player.send(event)
+        return {'ok': True}
+
+    def close_game(self, game_id, closed_by=None):
+        room = self.rooms.pop(game_id, None)
+        if room:
+            for player in set(room.players.values()):
+                player.games.discard(game_id)
+                if player is not closed_by:
+                    player.send({'event': 'closed', 'game': game_id})
+
+    def stats(self):
+        ordered = sorted(self.validation_times)
+        p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] if ordered else 0.0
+        return {
+            'games': len(self.rooms),
+            'moves_validated': self.moves_validated,
+            'slow_peers_dropped': self.slow_peers_dropped,
+            'validation_p99_us': p99 * 1e6
+        }
+
+async def serve(host='127.0.0.1', port=8765):
+    server = ChessServer()
+    listener = await asyncio.start_server(server.handle_connection, host, port, limit=1 << 20)
+    print(f"Chess server listening on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-game chess server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -0,0 +1,434 @@
+import os
+import sys
+import mmap
+import time
+import argparse
+import multiprocessing
+from array import array
+from chess_rules import ChessBoard, ChessPiece
+
+# Endgame tablebases for the chess1.py rules, solved by retrograde analysis.
+#
+# Under these rules there is no check: a game is won by capturing the king, so a position
+# where the side to move can take the king is a win in 1 ply, and being stuck with only
+# king-losing moves is a loss. Positions with no moves at all count as draws.
+#
+# Each table covers one material set "K<white pieces>K" (black has a lone king; positions
+# with the colours reversed are probed by mirroring the board). A table file is a 16 byte
+# header followed by one byte per position, addressed by
+#     index = side * 64**n + sum(square[i] * 64**(n - 1 - i)),   square = row * 8 + col
+# with the pieces ordered white king, black king, then the white pieces as named.
+# The byte is the distance to the king capture in plies for the side to move: odd = wins,
+# even = loses, 0 = draw, 255 = not a legal placement.
+
+MAGIC = b'CTB1'
+HEADER_SIZE = 16
+DRAW = 0
+INVALID = 255
+TABLE_PIECES = {'Q': 'queen', 'R': 'rook', 'B': 'bishop', 'N': 'knight', 'P': 'pawn'}
+PIECE_LETTERS = {piece_type: letter for letter, piece_type in TABLE_PIECES.items()}
+LETTER_ORDER = 'QRBNP'
+CHUNK_SIZE = 1 << 15
+# Added to the move count of a position with a capture that does not lose, so it never reaches zero
+ESCAPE = 200
+
+KING_STEPS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+KNIGHT_STEPS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+SLIDER_DIRECTIONS = {
+    'rook': [(0, 1), (0, -1), (1, 0), (-1, 0)],
+    'bishop': [(1, 1), (1, -1), (-1, 1), (-1, -1)],
+    'queen': [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)],
+}
+
+def step_targets(steps):
+    targets = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        targets.append([(row + dr) * 8 + col + dc for dr, dc in steps if 0 <= row + dr < 8 and 0 <= col + dc < 8])
+    return targets
+
+def ray_targets(directions):
+    rays = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        square_rays = []
+        for dr, dc in directions:
+            ray, r, c = [], row + dr, col + dc
+            while 0 <= r < 8 and 0 <= c < 8:
+                ray.append(r * 8 + c)
+                r, c = r + dr, c + dc
+            square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+KING_TARGETS = step_targets(KING_STEPS)
+KNIGHT_TARGETS = step_targets(KNIGHT_STEPS)
+SLIDER_RAYS = {piece_type: ray_targets(directions) for piece_type, directions in SLIDER_DIRECTIONS.items()}
+
+def normalize_name(name):
+    name = name.upper()
+    if len(name) < 2 or name[0] != 'K' or name[-1] != 'K' or any(c not in TABLE_PIECES for c in name[1:-1]):
+        raise ValueError(f"unsupported table {name!r}: expected K<pieces>K with pieces from {LETTER_ORDER}")
+    return 'K' + ''.join(sorted(name[1:-1], key=LETTER_ORDER.index)) + 'K'
+
+def subtable_names(name):
+    extras = name[1:-1]
+    return sorted({'K' + extras[:i] + extras[i + 1:] + 'K' for i in range(len(extras))})
+
+def table_path(directory, name):
+    return os.path.join(directory, f"{name}.tb")
+
+class TableLayout:
+    """Piece slots and index arithmetic of one table."""
+
+    def __init__(self, name):
+        self.name = normalize_name(name)
+        self.pieces = [('white', 'king'), ('black', 'king')] + [('white', TABLE_PIECES[c]) for c in self.name[1:-1]]
+        self.count = len(self.pieces)
+        self.positions = 64 ** self.count
+        self.size = 2 * self.positions
+        self.weights = [64 ** (self.count - 1 - i) for i in range(self.count)]
+
+    def encode(self, squares, side):
+        index = self.positions if side == 'black' else 0
+        for sq, weight in zip(squares, self.weights):
+            index += sq * weight
+        return index
+
+    def decode(self, index):
+        side, rest = divmod(index, self.positions)
+        squares = [0] * self.count
+        for i in range(self.count - 1, -1, -1):
+            rest, squares[i] = divmod(rest, 64)
+        return ('black' if side else 'white'), squares
+
+    def is_valid(self, squares):
+        if len(set(squares)) != self.count:
+            return False
+        # A white pawn can never stand on its own back rank
+        return all(piece_type != 'pawn' or sq < 56 for (_, piece_type), sq in zip(self.pieces, squares))
+
+class Tablebase:
+    """A memory-mapped table file; probing is a single byte read."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a tablebase file")
+        self.layout = TableLayout(self.data[4:HEADER_SIZE].rstrip(b'\0').decode())
+        if len(self.data) != HEADER_SIZE + self.layout.size:
+            raise ValueError(f"{path} is truncated")
+
+    def probe_index(self, index):
+        return self.data[HEADER_SIZE + index]
+
+    def probe(self, squares, side):
+        return self.data[HEADER_SIZE + self.layout.encode(squares, side)]
+
+    def close(self):
+        self.data.close()
+
+class TableSolver:
+    """Per-process generation state: forward move counting on a ChessBoard and unmove generation."""
+
+    def __init__(self, name, directory):
+        self.layout = TableLayout(name)
+        self.board = ChessBoard()
+        self.board.board = [[None] * 8 for _ in range(8)]
+        self.pieces = [ChessPiece(color, piece_type) for color, piece_type in self.layout.pieces]
+        self.slots = {id(piece): slot for slot, piece in enumerate(self.pieces)}
+        self.subtables = {}
+        for slot in range(2, self.layout.count):
+            extras = self.layout.name[1:-1]
+            sub_name = 'K' + extras[:slot - 2] + extras[slot - 1:] + 'K'
+            if sub_name not in self.subtables:
+                self.subtables[sub_name] = Tablebase(table_path(directory, sub_name))
+
+    def capture_value(self, squares, mover, to_sq, captured, side):
+        # Value of the smaller table's position after a piece is taken, for the side then to move
+        extras = self.layout.name[1:-1]
+        table = self.subtables['K' + extras[:captured - 2] + extras[captured - 1:] + 'K']
+        remaining = [to_sq if slot == mover else sq for slot, sq in enumerate(squares) if slot != captured]
+        return table.probe(remaining, side)
+
+    def count_moves(self, start, stop):
+        """Classify positions [start, stop). Returns their initial values and move counts, plus
+        events keyed by ply: positions that win at that ply, and counts to decrement at that ply."""
+        layout = self.layout
+        values = bytearray(stop - start)
+        counts = bytearray(stop - start)
+        wins, decrements = {}, {}
+        board = self.board
+        grid = board.board
+        pieces = self.pieces
+        for index in range(start, stop):
+            side, squares = layout.decode(index)
+            if not layout.is_valid(squares):
+                values[index - start] = INVALID
+                continue
+            for piece, sq in zip(pieces, squares):
+                grid[sq >> 3][sq & 7] = piece
+                if piece.piece_type == 'pawn':
+                    piece.has_moved = sq >> 3 != 6
+            board.current_player = side
+            opponent = 'black' if side == 'white' else 'white'
+
+            count, escape, king_capture = 0, False, False
+            for slot, sq in enumerate(squares):
+                if pieces[slot].color != side:
+                    continue
+                for to_row, to_col in board.get_valid_moves(sq >> 3, sq & 7):
+                    target = grid[to_row][to_col]
+                    if target is None:
+                        count += 1
+                    elif target.piece_type == 'king':
+                        king_capture = True
+                        break
+                    else:
+                        value = self.capture_value(squares, slot, to_row * 8 + to_col, self.slots[id(target)], opponent)
+                        if value == DRAW or value % 2 == 0:
+                            escape = True
+                            if value:
+                                wins.setdefault(value + 1, array('I')).append(index)
+                        else:
+                            count += 1
+                            decrements.setdefault(value, array('I')).append(index)
+                if king_capture:
+                    break
+            for sq in squares:
+                grid[sq >> 3][sq & 7] = None
+
+            if king_capture:
+                wins.setdefault(1, array('I')).append(index)
+            else:
+                counts[index - start] = count + (ESCAPE if escape else 0)
+        return start, values, counts, wins, decrements
+
+    def unmoves(self, slot, sq, occupied):
+        piece_type = self.layout.pieces[slot][1]
+        if piece_type == 'king':
+            return [s for s in KING_TARGETS[sq] if s not in occupied]
+        if piece_type == 'knight':
+            return [s for s in KNIGHT_TARGETS[sq] if s not in occupied]
+        if piece_type == 'pawn':
+            # White pawns move up the board (towards row 0), one step or two from row 6
+            origins = []
+            if sq + 8 < 56 and sq + 8 not in occupied:
+                origins.append(sq + 8)
+                if sq >> 3 == 4 and sq + 16 not in occupied:
+                    origins.append(sq + 16)
+            return origins
+        origins = []
+        for ray in SLIDER_RAYS[piece_type][sq]:
+            for s in ray:
+                if s in occupied:
+                    break
+                origins.append(s)
+        return origins
+
+    def predecessors(self, indices):
+        """Indices of every position one non-capturing move before each of the given positions."""
+        layout = self.layout
+        result = array('I')
+        for index in indices:
+            side, squares = layout.decode(index)
+            previous = 'black' if side == 'white' else 'white'
+            base = index + (layout.positions if previous == 'black' else -layout.positions)
+            occupied = set(squares)
+            for slot, sq in enumerate(squares):
+                if layout.pieces[slot][0] != previous:
+                    continue
+                weight = layout.weights[slot]
+                result.extend(base + (origin - sq) * weight for origin in self.unmoves(slot, sq, occupied))
+        return result
+
+_solver = None
+
+def _init_worker(name, directory):
+    global _solver
+    _solver = TableSolver(name, directory)
+
+def _count_chunk(bounds):
+    return _solver.count_moves(*bounds)
+
+def _predecessor_chunk(indices):
+    return _solver.predecessors(indices)
+
+def generate_table(name, directory, workers=None, log=print):
+    """Solve one table (its subtables must already exist) and write it to the directory."""
+    layout = TableLayout(name)
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    values = bytearray(layout.size)
+    counts = bytearray(layout.size)
+    pending_wins, pending_decrements = {}, {}
+
+    pool = multiprocessing.Pool(workers, _init_worker, (layout.name, directory)) if workers > 1 else None
+    if pool is None:
+        _init_worker(layout.name, directory)
+    run = pool.imap_unordered if pool else map
+    try:
+        chunks = [(start, min(start + CHUNK_SIZE, layout.size)) for start in range(0, layout.size, CHUNK_SIZE)]
+        for start, chunk_values, chunk_counts, wins, decrements in run(_count_chunk, chunks):
+            values[start:start + len(chunk_values)] = chunk_values
+            counts[start:start + len(chunk_counts)] = chunk_counts
+            for ply, indices in wins.items():
+                pending_wins.setdefault(ply, array('I')).extend(indices)
+            for ply, indices in decrements.items():
+                pending_decrements.setdefault(ply, array('I')).extend(indices)
+
+        def predecessors_of(indices):
+            batches = [indices[i:i + CHUNK_SIZE // 8] for i in range(0, len(indices), CHUNK_SIZE // 8)]
+            for batch in run(_predecessor_chunk, batches):
+                yield from batch
+
+        ply, losses = 1, []
+        while losses or pending_wins or pending_decrements:
+            if ply >= INVALID:
+                raise ValueError(f"{layout.name}: distance to capture exceeds {INVALID - 1} plies")
+            if ply % 2:
+                wins = []
+                for index in pending_wins.pop(ply, ()):
+                    if values[index] == 0:
+                        values[index] = ply
+                        wins.append(index)
+                losses = []
+                for source in (predecessors_of(wins), pending_decrements.pop(ply, ())):
+                    for index in source:
+                        if values[index] == 0:
+                            counts[index] -= 1
+                            if counts[index] == 0:
+                                losses.append(index)
+            else:
+                lost = []
+                for index in losses:
+                    if values[index] == 0:
+                        values[index] = ply
+                        lost.append(index)
+                losses = []
+                if lost:
+                    pending_wins.setdefault(ply + 1, array('I')).extend(predecessors_of(lost))
+            ply += 1
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    os.makedirs(directory, exist_ok=True)
+    path = table_path(directory, layout.name)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(MAGIC + layout.name.encode().ljust(HEADER_SIZE - len(MAGIC), b'\0'))
+        f.write(values)
+    os.replace(path + '.tmp', path)
+
+    longest = max((v for v in values if v != INVALID), default=0)
+    won = sum(1 for v in values if v != INVALID and v % 2)
+    lost = sum(1 for v in values if v and v != INVALID and v % 2 == 0)
+    drawn = values.count(DRAW)
+    log(f"{layout.name}: {layout.size} positions, {won} won, {lost} lost, {drawn} drawn, "
+        f"longest {longest} plies, {time.perf_counter() - start_time:.1f} s")
+    return path
+
+def generate(names, directory, workers=None, log=print):
+    """Generate the named tables and any smaller tables they capture down to, smallest first."""
+    needed, stack = set(), [normalize_name(name) for name in names]
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(subtable_names(name))
+    for name in sorted(needed, key=len):
+        if not os.path.exists(table_path(directory, name)):
+            generate_table(name, directory, workers, log)
+
+class TablebaseSet:
+    """All tables in a directory, probed straight from a ChessBoard."""
+
+    def __init__(self, directory):
+        self.tables = {}
+        for filename in os.listdir(directory):
+            if filename.endswith('.tb'):
+                table = Tablebase(os.path.join(directory, filename))
+                self.tables[table.layout.name] = table
+
+    def probe(self, board):
+        """Return the stored value (see the module comment) for the side to move, or None if no table covers the board."""
+        white, black = [], []
+        for row in range(8):
+            for col in range(8):
+                piece = board.board[row][col]
+                if piece:
+                    (white if piece.color == 'white' else black).append((piece.piece_type, row * 8 + col))
+        side = board.current_player
+        if len(black) > 1:
+            if len(white) > 1:
+                return None
+            # Mirror the board so the side with material is white
+            white, black = [(t, (7 - sq // 8) * 8 + sq % 8) for t, sq in black], \
+                [(t, (7 - sq // 8) * 8 + sq % 8) for t, sq in white]
+            side = 'black' if side == 'white' else 'white'
+        extras = sorted((p for p in white if p[0] != 'king'), key=lambda p: LETTER_ORDER.index(PIECE_LETTERS[p[0]]))
+        kings = [sq for t, sq in white if t == 'king'] + [sq for t, sq in black if t == 'king']
+        if len(kings) != 2 or len(black) != 1:
+            return None
+        table = self.tables.get('K' + ''.join(PIECE_LETTERS[t] for t, _ in extras) + 'K')
+        if table is None:
+            return None
+        return table.probe(kings + [sq for _, sq in extras], side)
+
+    def best_move(self, board):
+        """Pick the move with the best stored outcome by probing each successor: (move, value) or None."""
+        if self.probe(board) is None:
+            return None
+        best, best_key = None, None
+        for row in range(8):
+            for col in range(8):
+                piece = board.board[row][col]
+                if not piece or piece.color != board.current_player:
+                    continue
+                for to_row, to_col in board.get_valid_moves(row, col):
+                    target = board.board[to_row][to_col]
+                    if target and target.piece_type == 'king':
+                        return (row, col, to_row, to_col), 1
+                    moved = piece.has_moved
+                    board.board[to_row][to_col], board.board[row][col] = piece, None
+                    piece.has_moved = True
+                    board.current_player = 'black' if board.current_player == 'white' else 'white'
+                    reply = self.probe(board)
+                    board.current_player = piece.color
+                    board.board[row][col], board.board[to_row][to_col] = piece, target
+                    piece.has_moved = moved
+                    if reply is None or reply == INVALID:
+                        continue
+                    # Our value is one ply longer than the reply's, with the result flipped
+                    value = reply + 1 if reply else DRAW
+                    if value % 2:
+                        key = (2, -value)
+                    elif value == DRAW:
+                        key = (1, 0)
+                    else:
+                        key = (0, value)
+                    if best_key is None or key > best_key:
+                        best, best_key = ((row, col, to_row, to_col), value), key
+        return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Endgame tablebases for the chess1.py rules")
+    parser.add_argument("tables", nargs='*', default=['KQK', 'KRK', 'KPK', 'KBNK'], help="tables to generate")
+    parser.add_argument("--dir", default="tablebases", help="directory for the .tb files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--probe", metavar="FEN", help="look up a position instead of generating")
+    args = parser.parse_args()
+    if args.probe:
+        from chess_uci import EngineBoard, move_to_uci
+        board = EngineBoard(args.probe)
+        tablebases = TablebaseSet(args.dir)
+        value = tablebases.probe(board)
+        if value is None:
+            sys.exit("no table covers this position")
+        result = 'draw' if value == DRAW else f"{'win' if value % 2 else 'loss'} in {value} plies"
+        best = tablebases.best_move(board)
+        print(f"{result}, best move {move_to_uci(best[0]) if best else 'none'}")
+    else:
+        generate(args.tables, args.dir, args.workers)
\ No newline at end of file
@@ -0,0 +1,598 @@
+import sys
+import copy
+import random
+import threading
+import time
+from chess_rules import ChessBoard, ChessPiece
+from chess_tablebase import TablebaseSet
+
+# UCI front-end for the chess1.py rules. The engine plays exactly what chess_rules.ChessBoard
+# allows (no castling, en passant, promotion or check), so a game is won by capturing the king.
+
+ENGINE_NAME = "chess1"
+ENGINE_AUTHOR = "Aryan Joshi"
+
+PIECE_TYPES = ['pawn', 'knight', 'bishop', 'rook', 'queen', 'king']
+PIECE_VALUES = {'pawn': 100, 'knight': 320, 'bishop': 330, 'rook': 500, 'queen': 900, 'king': 0}
+FEN_PIECES = {'p': 'pawn', 'n': 'knight', 'b': 'bishop', 'r': 'rook', 'q': 'queen', 'k': 'king'}
+
+MATE = 100000
+MATE_BOUND = MATE - 1000
+INFINITY = MATE + 1
+MAX_DEPTH = 64
+EXACT, LOWER, UPPER = 0, 1, 2
+DEFAULT_HASH_MB = 64
+HASH_ENTRY_BYTES = 200  # rough cost of one transposition table entry in a dict
+
+def square_bonus(color, piece_type, row, col):
+    # Both sides share one table, seen from their own back rank
+    rank = 7 - row if color == 'white' else row
+    centre = 3 - int(max(abs(3.5 - row), abs(3.5 - col)))
+    if piece_type == 'pawn':
+        return rank * 8 + (centre * 4 if 2 <= col <= 5 else 0)
+    if piece_type == 'knight':
+        return centre * 12 - 20
+    if piece_type == 'bishop':
+        return centre * 6
+    if piece_type == 'rook':
+        return 15 if rank == 6 else 0
+    if piece_type == 'queen':
+        return centre * 3
+    return -centre * 10 - rank * 5
+
+# Material plus square bonus, indexed [color][piece_type][row * 8 + col]
+PIECE_SQUARE = {
+    color: {
+        piece_type: [PIECE_VALUES[piece_type] + square_bonus(color, piece_type, sq // 8, sq % 8) for sq in range(64)]
+        for piece_type in PIECE_TYPES
+    }
+    for color in ('white', 'black')
+}
+
+_zobrist_rng = random.Random(20240501)
+ZOBRIST = {
+    color: {piece_type: [_zobrist_rng.getrandbits(64) for _ in range(64)] for piece_type in PIECE_TYPES}
+    for color in ('white', 'black')
+}
+SIDE_KEY = _zobrist_rng.getrandbits(64)
+
+def move_to_uci(move):
+    from_row, from_col, to_row, to_col = move
+    return f"{'abcdefgh'[from_col]}{8 - from_row}{'abcdefgh'[to_col]}{8 - to_row}"
+
+def parse_uci_move(text):
+    # A promotion suffix is accepted but has no effect: the rules keep the pawn as it is
+    if len(text) < 4 or text[0] not in 'abcdefgh' or text[2] not in 'abcdefgh' \
+            or text[1] not in '12345678' or text[3] not in '12345678':
+        return None
+    return (8 - int(text[1]), ord(text[0]) - ord('a'), 8 - int(text[3]), ord(text[2]) - ord('a'))
+
+class SearchAborted(Exception):
+    pass
+
+class EngineBoard(ChessBoard):
+    """ChessBoard with an incremental hash key and evaluation, and reversible moves for search."""
+
+    def __init__(self, fen=None):
+        super().__init__()
+        if fen:
+            self.load_fen(fen)
+        self.refresh()
+
+    def load_fen(self, fen):
+        fields = fen.split()
+        ranks = fields[0].split('/')
+        if len(ranks) != 8:
+            raise ValueError(f"expected 8 ranks, got {len(ranks)}")
+        self.board = [[None for _ in range(8)] for _ in range(8)]
+        for row, rank in enumerate(ranks):
+            col = 0
+            for char in rank:
+                if col >= 8:
+                    raise ValueError(f"rank {8 - row} has more than 8 files")
+                if char in '12345678':
+                    col += int(char)
+                    continue
+                if char.lower() not in FEN_PIECES:
+                    raise ValueError(f"unknown piece {char!r}")
+                color = 'white' if char.isupper() else 'black'
+                piece = ChessPiece(color, FEN_PIECES[char.lower()])
+                # Pawns off their starting rank have lost the double step
+                piece.has_moved = piece.piece_type != 'pawn' or row != (6 if color == 'white' else 1)
+                self.board[row][col] = piece
+                col += 1
+            if col != 8:
+                raise ValueError(f"rank {8 - row} has {col} files")
+        self.current_player = 'black' if len(fields) > 1 and fields[1] == 'b' else 'white'
+
+    def refresh(self):
+        self.key = SIDE_KEY if self.current_player == 'black' else 0
+        self.score = 0  # from white's point of view
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece:
+                    sq = row * 8 + col
+                    self.key ^= ZOBRIST[piece.color][piece.piece_type][sq]
+                    value = PIECE_SQUARE[piece.color][piece.piece_type][sq]
+                    self.score += value if piece.color == 'white' else -value
+
+    def evaluate(self):
+        return self.score if self.current_player == 'white' else -self.score
+
+    def generate_moves(self):
+        moves = []
+        color = self.current_player
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece and piece.color == color:
+                    moves.extend((row, col, to_row, to_col) for to_row, to_col in self.get_valid_moves(row, col))
+        return moves
+
+    def push(self, move):
+        from_row, from_col, to_row, to_col = move
+        board = self.board
+        piece = board[from_row][from_col]
+        captured = board[to_row][to_col]
+        undo = (captured, piece.has_moved, self.key, self.score)
+
+        from_sq, to_sq = from_row * 8 + from_col, to_row * 8 + to_col
+        keys = ZOBRIST[piece.color][piece.piece_type]
+        values = PIECE_SQUARE[piece.color][piece.piece_type]
+        key = self.key ^ keys[from_sq] ^ keys[to_sq] ^ SIDE_KEY
+        delta = values[to_sq] - values[from_sq]
+        if captured:
+            key ^= ZOBRIST[captured.color][captured.piece_type][to_sq]
+            delta += PIECE_SQUARE[captured.color][captured.piece_type][to_sq]
+        self.key = key
+        self.score += delta if piece.color == 'white' else -delta
+
+        board[to_row][to_col] = piece
+        board[from_row][from_col] = None
+        piece.has_moved = True
+        self.current_player = 'black' if self.current_player == 'white' else 'white'
+        return undo
+
+    def pop(self, move, undo):
+        from_row, from_col, to_row, to_col = move
+        captured, had_moved, self.key, self.score = undo
+        piece = self.board[to_row][to_col]
+        self.board[from_row][from_col] = piece
+        self.board[to_row][to_col] = captured
+        piece.has_moved = had_moved
+        self.current_player = 'black' if self.current_player == 'white' else 'white'
+
+def score_to_table(score, ply):
+    # Mate scores are stored relative to the node so they stay valid at other plies
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+def score_from_table(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+def tablebase_score(plies):
+    # A win in n plies captures the king at ply n - 1 of the search
+    if plies == 0:
+        return 0
+    return MATE - (plies - 1) if plies % 2 else -(MATE - (plies - 1))
+
+def format_score(score):
+    if abs(score) > MATE_BOUND:
+        moves = (MATE - abs(score)) // 2 + 1
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+class Search:
+    """Iterative-deepening alpha-beta. The transposition table and move ordering history
+    survive between searches, so each move (and a ponder hit) starts from what was learned."""
+
+    def __init__(self, report=print, hash_mb=DEFAULT_HASH_MB):
+        self.report = report
+        self.table = {}
+        self.resize(hash_mb)
+        self.history = [0] * 4096
+        self.killers = [[None, None] for _ in range(MAX_DEPTH + 1)]
+        self.stop_event = threading.Event()
+        self.soft_deadline = None
+        self.hard_deadline = None
+        self.max_nodes = None
+        self.nodes = 0
+        self.depth = 0
+        self.start_time = time.perf_counter()
+        self.last_report = self.start_time
+        self.root_best = None
+
+    def resize(self, hash_mb):
+        self.hash_entries = max(1024, hash_mb * 1024 * 1024 // HASH_ENTRY_BYTES)
+        if len(self.table) > self.hash_entries:
+            self.table.clear()
+
+    def clear(self):
+        self.table.clear()
+        self.history = [0] * 4096
+
+    def hashfull(self):
+        return min(1000, len(self.table) * 1000 // self.hash_entries)
+
+    def store(self, key, depth, flag, score, move):
+        table = self.table
+        entry = table.get(key)
+        if entry is not None and entry[0] > depth and flag != EXACT:
+            return
+        if entry is None and len(table) >= self.hash_entries:
+            # Dicts keep insertion order, so this evicts the oldest quarter
+            for old_key in list(table)[:self.hash_entries // 4]:
+                del table[old_key]
+        table[key] = (depth, flag, score, move)
+
+    def check_limits(self):
+        if self.stop_event.is_set():
+            raise SearchAborted()
+        now = time.perf_counter()
+        if self.hard_deadline is not None and now >= self.hard_deadline:
+            raise SearchAborted()
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchAborted()
+        if now - self.last_report >= 1.0:
+            self.last_report = now
+            elapsed = now - self.start_time
+            self.report(f"info depth {self.depth} nodes {self.nodes} nps {int(self.nodes / elapsed)} "
+                        f"time {int(elapsed * 1000)} hashfull {self.hashfull()}")
+
+    def run(self, board, max_depth=MAX_DEPTH):
+        """Search the board until a limit is hit; return (best move, expected reply) or (None, None)."""
+        self.nodes = 0
+        self.start_time = self.last_report = time.perf_counter()
+        self.history = [value >> 2 for value in self.history]
+        self.killers = [[None, None] for _ in range(MAX_DEPTH + 1)]
+
+        root_moves = board.generate_moves()
+        if not root_moves:
+            return None, None
+        best_move, pv = root_moves[0], [root_moves[0]]
+        entry = self.table.get(board.key)
+        if entry and entry[3] in root_moves:
+            best_move, pv = entry[3], [entry[3]]
+
+        for depth in range(1, min(max_depth, MAX_DEPTH) + 1):
+            self.depth = depth
+            try:
+                score = self.negamax(board, depth, -INFINITY, INFINITY, 0)
+            except SearchAborted:
+                break
+            best_move = self.root_best
+            pv = self.principal_variation(board, depth)
+            elapsed = time.perf_counter() - self.start_time
+            self.report(f"info depth {depth} score {format_score(score)} nodes {self.nodes} "
+                        f"nps {int(self.nodes / elapsed) if elapsed else 0} time {int(elapsed * 1000)} "
+                        f"hashfull {self.hashfull()} pv {' '.join(move_to_uci(move) for move in pv)}")
+            if abs(score) > MATE_BOUND:
+                break
+            if self.soft_deadline is not None and time.perf_counter() >= self.soft_deadline:
+                break
+        ponder = pv[1] if len(pv) > 1 and pv[0] == best_move else None
+        return best_move, ponder
+
+    def principal_variation(self, board, depth):
+        pv, played, seen = [], [], set()
+        while len(pv) < depth and board.key not in seen:
+            entry = self.table.get(board.key)
+            if not entry or entry[3] is None:
+                break
+            move = entry[3]
+            piece = board.board[move[0]][move[1]]
+            if not piece or piece.color != board.current_player:
+                break
+            seen.add(board.key)
+            played.append((move, board.push(move)))
+            pv.append(move)
+        for move, undo in reversed(played):
+            board.pop(move, undo)
+        return pv
+
+    def order_moves(self, board, moves, tt_move, ply):
+        squares = board.board
+        killers = self.killers[ply] if ply <= MAX_DEPTH else ()
+        history = self.history
+
+        def priority(move):
+            if move == tt_move:
+                return 10000000
+            victim = squares[move[2]][move[3]]
+            if victim:
+                # Most valuable victim, least valuable attacker
+                return 1000000 + 10 * PIECE_VALUES[victim.piece_type] \
+                    - PIECE_VALUES[squares[move[0]][move[1]].piece_type]
+            if move in killers:
+                return 900000
+            return history[(move[0] * 8 + move[1]) * 64 + move[2] * 8 + move[3]]
+
+        moves.sort(key=priority, reverse=True)
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_limits()
+        if depth <= 0:
+            return self.quiescence(board, alpha, beta, ply)
+
+        key = board.key
+        tt_move = None
+        entry = self.table.get(key)
+        if entry:
+            tt_depth, flag, tt_score, tt_move = entry
+            if tt_depth >= depth and ply > 0:
+                tt_score = score_from_table(tt_score, ply)
+                if flag == EXACT or (flag == LOWER and tt_score >= beta) or (flag == UPPER and tt_score <= alpha):
+                    return tt_score
+
+        moves = board.generate_moves()
+        if not moves:
+            return 0
+        squares = board.board
+        for move in moves:
+            target = squares[move[2]][move[3]]
+            if target and target.piece_type == 'king':
+                if ply == 0:
+                    self.root_best = move
+                return MATE - ply
+        self.order_moves(board, moves, tt_move, ply)
+
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, None
+        for index, move in enumerate(moves):
+            is_capture = squares[move[2]][move[3]] is not None
+            undo = board.push(move)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.pop(move, undo)
+
+            if score > best_score:
+                best_score, best_move = score, move
+                if ply == 0:
+                    self.root_best = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if not is_capture and ply <= MAX_DEPTH:
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1], killers[0] = killers[0], move
+                            self.history[(move[0] * 8 + move[1]) * 64 + move[2] * 8 + move[3]] += depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(key, depth, flag, score_to_table(best_score, ply), best_move)
+        return best_score
+
+    def quiescence(self, board, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_limits()
+        stand_pat = board.evaluate()
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        squares = board.board
+        captures = [move for move in board.generate_moves() if squares[move[2]][move[3]]]
+        for move in captures:
+            if squares[move[2]][move[3]].piece_type == 'king':
+                return MATE - ply
+        self.order_moves(board, captures, None, ply)
+        for move in captures:
+            undo = board.push(move)
+            score = -self.quiescence(board, -beta, -alpha, ply + 1)
+            board.pop(move, undo)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+def allocate_time(limits, color):
+    """Turn UCI go parameters into (soft, hard) limits in seconds, or (None, None) for no clock."""
+    if 'movetime' in limits:
+        seconds = max(0.01, limits['movetime'] / 1000 - 0.02)
+        return seconds, seconds
+    remaining = limits.get('wtime' if color == 'white' else 'btime')
+    if remaining is None:
+        return None, None
+    increment = limits.get('winc' if color == 'white' else 'binc', 0)
+    moves_to_go = limits.get('movestogo', 30)
+    soft = min(remaining / moves_to_go + increment * 0.75, remaining * 0.4)
+    hard = min(soft * 3, remaining * 0.8)
+    return max(0.01, soft / 1000 - 0.02), max(0.01, hard / 1000 - 0.02)
+
+class UCIEngine:
+    GO_PARAMETERS = ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'movetime', 'depth', 'nodes')
+
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.search = Search(self.send)
+        self.board = EngineBoard()
+        self.tablebases = None
+        self.worker = None
+        self.limits = {}
+        self.pondering = False
+        self.infinite = False
+        self.release = threading.Event()
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def loop(self, stream=sys.stdin):
+        for line in stream:
+            if not self.handle(line.strip()):
+                break
+        self.stop_search()
+
+    def handle(self, line):
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max 4096")
+            self.send("option name Ponder type check default true")
+            self.send("option name TablebasePath type string default <empty>")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'setoption':
+            self.set_option(tokens)
+        elif command == 'ucinewgame':
+            self.stop_search()
+            self.search.clear()
+        elif command == 'position':
+            self.stop_search()
+            self.set_position(tokens)
+        elif command == 'go':
+            self.go(tokens[1:])
+        elif command == 'stop':
+            self.stop_search()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'quit':
+            return False
+        return True
+
+    def set_option(self, tokens):
+        if 'name' not in tokens or 'value' not in tokens:
+            return
+        name = ' '.join(tokens[tokens.index('name') + 1:tokens.index('value')]).lower()
+        value = ' '.join(tokens[tokens.index('value') + 1:])
+        if name == 'hash' and value.isdigit():
+            self.search.resize(int(value))
+        elif name == 'tablebasepath':
+            self.tablebases = None
+            if value and value != '<empty>':
+                try:
+                    self.tablebases = TablebaseSet(value)
+                except (OSError, ValueError) as e:
+                    self.send(f"info string cannot load tablebases: {e}")
+
+    def set_position(self, tokens):
+        moves_at = tokens.index('moves') if 'moves' in tokens else len(tokens)
+        fen = ' '.join(tokens[2:moves_at]) if len(tokens) > 1 and tokens[1] == 'fen' else None
+        try:
+            board = EngineBoard(fen)
+        except ValueError as e:
+            self.send(f"info string invalid fen: {e}")
+            return
+        for text in tokens[moves_at + 1:]:
+            move = parse_uci_move(text)
+            if move is None or not board.is_valid_move(*move):
+                self.send(f"info string illegal move {text}")
+                break
+            board.push(move)
+        self.board = board
+
+    def go(self, tokens):
+        self.stop_search()
+        limits = {}
+        for name, value in zip(tokens, tokens[1:]):
+            if name in self.GO_PARAMETERS and value.lstrip('-').isdigit():
+                limits[name] = int(value)
+        self.limits = limits
+        self.pondering = 'ponder' in tokens
+        self.infinite = 'infinite' in tokens or not limits
+
+        search = self.search
+        search.stop_event.clear()
+        self.release.clear()
+        search.max_nodes = limits.get('nodes')
+        search.soft_deadline = search.hard_deadline = None
+        if not self.pondering:
+            self.set_deadlines()
+        board = copy.deepcopy(self.board)
+        self.worker = threading.Thread(target=self.think, args=(board, limits.get('depth', MAX_DEPTH)), daemon=True)
+        self.worker.start()
+
+    def set_deadlines(self):
+        soft, hard = allocate_time(self.limits, self.board.current_player)
+        now = time.perf_counter()
+        self.search.soft_deadline = now + soft if soft is not None else None
+        self.search.hard_deadline = now + hard if hard is not None else None
+
+    def think(self, board, max_depth):
+        probed = self.tablebases.best_move(board) if self.tablebases else None
+        if probed:
+            best_move, ponder_move = probed[0], None
+            self.send(f"info depth 1 score {format_score(tablebase_score(probed[1]))} nodes 0 tbhits 1 "
+                      f"pv {move_to_uci(best_move)}")
+            board.push(best_move)
+            reply = self.tablebases.best_move(board)
+            if reply:
+                ponder_move = reply[0]
+        else:
+            best_move, ponder_move = self.search.run(board, max_depth)
+        # While pondering or on infinite, bestmove has to wait for ponderhit or stop
+        if self.pondering or self.infinite:
+            self.release.wait()
+        if best_move is None:
+            self.send("bestmove 0000")
+        elif ponder_move:
+            self.send(f"bestmove {move_to_uci(best_move)} ponder {move_to_uci(ponder_move)}")
+        else:
+            self.send(f"bestmove {move_to_uci(best_move)}")
+
+    def ponderhit(self):
+        # The opponent played the expected move: keep the running search and start our clock
+        if self.worker and self.pondering:
+            self.pondering = False
+            self.set_deadlines()
+            if not self.infinite:
+                self.release.set()
+
+    def stop_search(self):
+        if self.worker:
+            self.search.stop_event.set()
+            self.release.set()
+            self.worker.join()
+            self.worker = None
+
+BENCH_POSITIONS = [
+    None,
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w",
+    "r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 w",
+    "8/2k5/8/3p4/3P4/8/2K5/8 w",
+]
+
+def bench(depth=4):
+    """Fixed-depth search over a few positions; prints total nodes and nodes per second."""
+    search = Search(report=lambda line: None)
+    nodes, start = 0, time.perf_counter()
+    for fen in BENCH_POSITIONS:
+        search.clear()
+        search.run(EngineBoard(fen), depth)
+        nodes += search.nodes
+    elapsed = time.perf_counter() - start
+    print(f"{nodes} nodes {elapsed:.2f} s {int(nodes / elapsed)} nps")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        bench(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    else:
+        UCIEngine().loop()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# One entry point for all four games. Only the standard library is imported up front:
+# tkinter or pygame (and the game module itself) are loaded once a game has been picked,
+# so starting one game never pays for the others' GUI stacks.
+
+class StartupTimer:
+    """Records the time from launcher start to each startup stage of one game."""
+
+    def __init__(self, game, exit_after_first_frame=False):
+        self.game = game
+        self.exit_after_first_frame = exit_after_first_frame
+        self.marks = {}
+
+    def mark(self, stage):
+        self.marks[stage] = time.perf_counter()
+
+    def first_frame(self):
+        """Report the startup breakdown; returns True if the game should close now."""
+        self.mark('first_frame')
+        stages = {'import_ms': self.marks['imported'] - STARTED,
+                  'build_ms': self.marks['built'] - self.marks['imported'],
+                  'draw_ms': self.marks['first_frame'] - self.marks['built'],
+                  'first_frame_ms': self.marks['first_frame'] - STARTED}
+        report = {'game': self.game}
+        report.update((stage, seconds * 1000) for stage, seconds in stages.items())
+        print(json.dumps(report), flush=True)
+        return self.exit_after_first_frame
+
+def run_tk(window, timer):
+    timer.mark('built')
+    # Map the window and draw everything queued so far: that is the first frame
+    window.update()
+    if timer.first_frame():
+        window.destroy()
+    else:
+        window.mainloop()
+
+def launch_chess(module, timer):
+    import tkinter as tk
+    root = tk.Tk()
+    module.ChessGame(root)
+    run_tk(root, timer)
+
+def launch_snake_ladder(module, timer):
+    run_tk(module.SnakeAndLadder().window, timer)
+
+def launch_snake(module, timer):
+    run_tk(module.SnakeGame().window, timer)
+
+def launch_space_invaders(module, timer):
+    pygame = module.pygame
+    game = module.Game()
+    timer.mark('built')
+
+    def on_first_frame():
+        if timer.first_frame():
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    game.run(on_first_frame=on_first_frame)
+
+GAMES = {
+    'chess': ("Chess", 'chess1', launch_chess),
+    'snake-ladder': ("Snake and Ladder", 'snake_2', launch_snake_ladder),
+    'snake': ("Snake", 'snake_3', launch_snake),
+    'space-invaders': ("Space Invaders", 'spaceinvader2', launch_space_invaders)
+}
+
+def launch(game, exit_after_first_frame=False):
+    _, module_name, start = GAMES[game]
+    timer = StartupTimer(game, exit_after_first_frame)
+    module = importlib.import_module(module_name)
+    timer.mark('imported')
+    start(module, timer)
+
+def choose_game():
+    names = list(GAMES)
+    for number, name in enumerate(names, 1):
+        print(f"{number}. {GAMES[name][0]}")
+    while True:
+        choice = input("Pick a game: ").strip()
+        if choice in GAMES:
+            return choice
+        if choice.isdigit() and 1 <= int(choice) <= len(names):
+            return names[int(choice) - 1]
+
+def measure_cold_start(game, runs):
+    """Start game in a fresh interpreter runs times and time each one up to its first frame."""
+    command = [sys.executable, os.path.abspath(__file__), game, '--exit-after-first-frame']
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        report = None
+        for line in process.stdout:
+            if line.startswith('{'):
+                report = json.loads(line)
+                report['process_ms'] = (time.perf_counter() - start) * 1000
+                break
+        _, errors = process.communicate()
+        if report is None:
+            lines = errors.strip().splitlines()
+            return {'game': game, 'error': lines[-1] if lines else f"exit status {process.returncode}"}
+        results.append(report)
+    summary = {'game': game, 'runs': runs}
+    for stage in ('import_ms', 'build_ms', 'draw_ms', 'first_frame_ms', 'process_ms'):
+        summary[stage] = statistics.median(result[stage] for result in results)
+    return summary
+
+def startup_report(games, runs):
+    results = []
+    for game in games:
+        result = measure_cold_start(game, runs)
+        results.append(result)
+        if 'error' in result:
+            print(f"{game:>14}: failed: {result['error']}")
+        else:
+            print(f"{game:>14}: import {result['import_ms']:7.1f} ms  build {result['build_ms']:7.1f} ms  "
+                  f"draw {result['draw_ms']:6.1f} ms  in-process {result['first_frame_ms']:7.1f} ms  "
+                  f"spawn to first frame {result['process_ms']:7.1f} ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Launch one of the games")
+    parser.add_argument("game", nargs='?', choices=sorted(GAMES), help="game to start (default: ask)")
+    parser.add_argument("--exit-after-first-frame", action="store_true",
+                        help="print the startup breakdown as JSON and quit once the first frame is drawn")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="measure cold-start time to first frame for each game (or just the one given), then exit")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per game for --startup-report (median reported)")
+    parser.add_argument("--json", help="with --startup-report, also write the results to this file")
+    args = parser.parse_args()
+    # pygame prints a banner on import; keep stdout for the game and the startup report
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+    if args.startup_report:
+        results = startup_report([args.game] if args.game else list(GAMES), args.runs)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+    else:
+        launch(args.game or choose_game(), args.exit_after_first_frame)
\ No newline at end of file
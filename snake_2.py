@@ -3,10 +3,12 @@ from tkinter import messagebox
 import random
 
 class SnakeAndLadder:
-    def __init__(self):
-        self.window = tk.Tk()
-        self.window.title("Snake and Ladder")
-        self.window.geometry("800x600")
+    def __init__(self, headless=False):
+        # Headless games have no window: the caller drives move_player() itself
+        self.window = None if headless else tk.Tk()
+        if self.window:
+            self.window.title("Snake and Ladder")
+            self.window.geometry("800x600")
         
         # Define snakes and ladders
         self.snakes = {
@@ -39,8 +41,9 @@ class SnakeAndLadder:
         self.player2_pos = 0
         self.current_player = 1
         
-        self.create_board()
-        self.create_controls()
+        if self.window:
+            self.create_board()
+            self.create_controls()
         
     def create_board(self):
         # Create main board frame
@@ -168,6 +171,9 @@ class SnakeAndLadder:
         self.update_board()
     
     def update_board(self):
+        if not self.window:
+            return
+        
         # Reset all cell colors (except snakes and ladders)
         for num, cell in self.cells.items():
             if num not in self.snakes and num not in self.ladders:
@@ -184,13 +190,16 @@ class SnakeAndLadder:
             self.cells[self.player1_pos].configure(bg='purple')
     
     def update_labels(self):
+        if not self.window:
+            return
         self.status_label.configure(text=f"Player {self.current_player}'s turn")
         self.positions_label.configure(
             text=f"Player 1: {self.player1_pos} | Player 2: {self.player2_pos}"
         )
     
     def game_won(self, player):
-        messagebox.showinfo("Game Over", f"Player {player} wins!")
+        if self.window:
+            messagebox.showinfo("Game Over", f"Player {player} wins!")
         self.new_game()
     
     def new_game(self):
@@ -2,31 +2,180 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import random
 import time
+import argparse
+
+PANEL_WIDTH = 200  # room for the controls to the left of the board
+MIN_WINDOW_HEIGHT = 600
+
+class CanvasRenderer:
+    """Draws every cell and grid line as its own canvas item, rebuilt each tick."""
+
+    def __init__(self, game):
+        self.game = game
+        self.canvas = game.canvas
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.draw_grid()
+
+    def draw_grid(self):
+        game = self.game
+        # Draw vertical lines
+        for i in range(game.width):
+            x = i * game.cell_size
+            self.canvas.create_line(
+                x, 0, x, game.height * game.cell_size,
+                fill=game.colors["grid"]
+            )
+        
+        # Draw horizontal lines
+        for i in range(game.height):
+            y = i * game.cell_size
+            self.canvas.create_line(
+                0, y, game.width * game.cell_size, y,
+                fill=game.colors["grid"]
+            )
+
+    def draw_cell(self, x, y, color):
+        size = self.game.cell_size
+        self.canvas.create_rectangle(
+            x * size,
+            y * size,
+            (x + 1) * size,
+            (y + 1) * size,
+            fill=color,
+            outline=""
+        )
+
+    def present(self):
+        pass
+
+class PixelRenderer:
+    """Draws the board into a single tk.PhotoImage, for grids too large for one canvas item per cell.
+
+    One byte per cell records the palette colour currently on screen. Each tick the game's
+    draw calls only collect the cells of the new frame; present() compares them with that
+    buffer and repaints just the cells that changed, scaled up to cell_size pixels."""
+
+    def __init__(self, game):
+        self.game = game
+        self.width = game.width
+        self.height = game.height
+        self.cell_size = game.cell_size
+        self.palette = [game.colors["background"]]
+        self.palette_index = {game.colors["background"]: 0}
+        self.cells = bytearray(self.width * self.height)
+        self.frame = {}
+        self.painted = []
+        self.image = tk.PhotoImage(width=self.width * self.cell_size, height=self.height * self.cell_size)
+        game.canvas.create_image(0, 0, image=self.image, anchor="nw")
+        self.fill_background()
+
+    def fill_background(self):
+        size = self.cell_size
+        pixel_width, pixel_height = self.width * size, self.height * size
+        grid = self.game.colors["grid"]
+        self.image.put(self.palette[0], to=(0, 0, pixel_width, pixel_height))
+        # Same grid as the canvas renderer: a line on the left and top edge of every cell
+        for i in range(self.width):
+            self.image.put(grid, to=(i * size, 0, i * size + 1, pixel_height))
+        for i in range(self.height):
+            self.image.put(grid, to=(0, i * size, pixel_width, i * size + 1))
+
+    def clear(self):
+        self.frame = {}
+
+    def draw_grid(self):
+        # The grid is part of the background and never needs redrawing
+        pass
+
+    def draw_cell(self, x, y, color):
+        index = self.palette_index.get(color)
+        if index is None:
+            index = self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        self.frame[y * self.width + x] = index
+
+    def present(self):
+        cells = self.cells
+        frame = self.frame
+        for cell in self.painted:
+            if cell not in frame and cells[cell]:
+                self.paint_cell(cell, 0)
+        for cell, index in frame.items():
+            if cells[cell] != index:
+                self.paint_cell(cell, index)
+        self.painted = list(frame)
+
+    def paint_cell(self, cell, index):
+        self.cells[cell] = index
+        size = self.cell_size
+        y, x = divmod(cell, self.width)
+        x0, y0 = x * size, y * size
+        self.image.put(self.palette[index], to=(x0, y0, x0 + size, y0 + size))
+        if index == 0:
+            grid = self.game.colors["grid"]
+            self.image.put(grid, to=(x0, y0, x0 + 1, y0 + size))
+            self.image.put(grid, to=(x0, y0, x0 + size, y0 + 1))
+
+class NullRenderer:
+    """Used when the game runs without a window."""
+
+    def clear(self):
+        pass
+
+    def draw_grid(self):
+        pass
+
+    def draw_cell(self, x, y, color):
+        pass
+
+    def present(self):
+        pass
+
+class HeadlessVar:
+    """Stands in for tk.StringVar when there is no Tk root."""
+
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+RENDERERS = {"canvas": CanvasRenderer, "pixels": PixelRenderer}
 
 class SnakeGame:
-    def __init__(self):
-        self.window = tk.Tk()
-        self.window.title("Advanced Snake Game")
-        self.window.geometry("800x600")
-        self.window.resizable(False, False)
+    def __init__(self, width=30, height=20, cell_size=20, renderer="canvas", headless=False):
+        # Headless games have no window: the caller drives move_snake() itself
+        self.window = None if headless else tk.Tk()
+        if self.window:
+            self.window.title("Advanced Snake Game")
+            self.window.geometry(f"{width * cell_size + PANEL_WIDTH}x{max(MIN_WINDOW_HEIGHT, height * cell_size + 20)}")
+            self.window.resizable(False, False)
         
         # Game settings
-        self.cell_size = 20
-        self.width = 30
-        self.height = 20
+        self.cell_size = cell_size
+        self.width = width
+        self.height = height
+        self.renderer_name = renderer
         self.speed = 100  # milliseconds between moves
         self.difficulty = "Normal"
         
         # Game state
         self.direction = "Right"
         self.next_direction = "Right"
-        self.snake = [(15, 10), (14, 10), (13, 10)]
+        self.snake = self.starting_snake()
         self.food = None
         self.special_food = None
         self.score = 0
         self.high_score = 0
         self.game_running = False
         self.paused = False
+        # Called as listener(game, event) with event "new_game", "tick" or "game_over"
+        self.tick_listeners = []
         
         # Colors
         self.colors = {
@@ -38,8 +187,14 @@ class SnakeGame:
             "grid": "#2d2d2d"
         }
         
-        self.create_widgets()
-        self.create_bindings()
+        if self.window:
+            self.create_widgets()
+            self.create_bindings()
+        else:
+            self.renderer = NullRenderer()
+            self.score_var = HeadlessVar("Score: 0")
+            self.high_score_var = HeadlessVar("High Score: 0")
+            self.difficulty_var = HeadlessVar("Normal")
         
     def create_widgets(self):
         # Create main container
@@ -59,6 +214,7 @@ class SnakeGame:
             highlightthickness=0
         )
         self.canvas.pack(side="right", padx=10, pady=10)
+        self.renderer = RENDERERS[self.renderer_name](self)
         
         # Score display
         self.score_var = tk.StringVar(value="Score: 0")
@@ -112,32 +268,15 @@ class SnakeGame:
         self.window.bind("<p>", lambda e: self.toggle_pause())
         self.window.bind("<Escape>", lambda e: self.window.quit())
         
+    def starting_snake(self):
+        x, y = self.width // 2, self.height // 2
+        return [(x, y), (x - 1, y), (x - 2, y)]
+
     def draw_grid(self):
-        # Draw vertical lines
-        for i in range(self.width):
-            x = i * self.cell_size
-            self.canvas.create_line(
-                x, 0, x, self.height * self.cell_size,
-                fill=self.colors["grid"]
-            )
-        
-        # Draw horizontal lines
-        for i in range(self.height):
-            y = i * self.cell_size
-            self.canvas.create_line(
-                0, y, self.width * self.cell_size, y,
-                fill=self.colors["grid"]
-            )
+        self.renderer.draw_grid()
             
     def draw_cell(self, x, y, color):
-        self.canvas.create_rectangle(
-            x * self.cell_size,
-            y * self.cell_size,
-            (x + 1) * self.cell_size,
-            (y + 1) * self.cell_size,
-            fill=color,
-            outline=""
-        )
+        self.renderer.draw_cell(x, y, color)
         
     def draw_snake(self):
         # Draw snake body
@@ -225,16 +364,22 @@ class SnakeGame:
         self.score_var.set(f"Score: {self.score}")
         
         # Redraw game
-        self.canvas.delete("all")
-        self.draw_grid()
+        self.renderer.clear()
         self.draw_snake()
         if self.food:
             self.draw_cell(self.food[0], self.food[1], self.colors["food"])
         if self.special_food:
             self.draw_cell(self.special_food[0], self.special_food[1], self.colors["special_food"])
+        self.renderer.present()
+        self.notify("tick")
             
         # Schedule next move
-        self.window.after(self.speed, self.move_snake)
+        if self.window:
+            self.window.after(self.speed, self.move_snake)
+
+    def notify(self, event):
+        for listener in self.tick_listeners:
+            listener(self, event)
         
     def change_difficulty(self, _=None):
         difficulty = self.difficulty_var.get()
@@ -254,7 +399,7 @@ class SnakeGame:
                 
     def new_game(self):
         # Reset game state
-        self.snake = [(15, 10), (14, 10), (13, 10)]
+        self.snake = self.starting_snake()
         self.direction = "Right"
         self.next_direction = "Right"
         self.score = 0
@@ -265,10 +410,11 @@ class SnakeGame:
         
         # Update display
         self.score_var.set("Score: 0")
-        self.canvas.delete("all")
-        self.draw_grid()
+        self.renderer.clear()
         self.draw_snake()
         self.spawn_food()
+        self.renderer.present()
+        self.notify("new_game")
         
         # Start game
         self.move_snake()
@@ -278,12 +424,21 @@ class SnakeGame:
         if self.score > self.high_score:
             self.high_score = self.score
             self.high_score_var.set(f"High Score: {self.high_score}")
+        self.notify("game_over")
             
-        messagebox.showinfo("Game Over", f"Final Score: {self.score}\nHigh Score: {self.high_score}")
+        if self.window:
+            messagebox.showinfo("Game Over", f"Final Score: {self.score}\nHigh Score: {self.high_score}")
         
     def run(self):
         self.window.mainloop()
 
 if __name__ == "__main__":
-    game = SnakeGame()
+    parser = argparse.ArgumentParser(description="Advanced Snake Game")
+    parser.add_argument("--width", type=int, default=30, help="board width in cells")
+    parser.add_argument("--height", type=int, default=20, help="board height in cells")
+    parser.add_argument("--cell-size", type=int, default=20, help="cell size in pixels")
+    parser.add_argument("--renderer", choices=sorted(RENDERERS), default="canvas",
+                        help="'pixels' draws into one image, for large boards")
+    args = parser.parse_args()
+    game = SnakeGame(args.width, args.height, args.cell_size, args.renderer)
     game.run()
\ No newline at end of file
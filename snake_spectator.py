@@ -0,0 +1,385 @@
+import asyncio
+import argparse
+import struct
+import threading
+import time
+from collections import deque
+from snake_3 import SnakeGame
+
+# Live Snake broadcast for spectators.
+#
+# Every frame is a uint32 length followed by a one byte type and a little-endian payload:
+#   K keyframe   tick, width, height, score, food x/y, special food x/y, snake length, snake cells
+#   D delta      tick, new head x/y, flags, then food x/y, special food x/y and score if flagged
+#   G game over  tick, score
+# Absent food is sent as -1, -1. A spectator that joins (or falls behind) is synced with the
+# latest keyframe plus the deltas since, so keyframes only need to go out every so often.
+
+FRAME_HEADER = struct.Struct('<IB')
+KEYFRAME = struct.Struct('<IHHIhhhhI')
+DELTA = struct.Struct('<IhhB')
+POINT = struct.Struct('<hh')
+SCORE = struct.Struct('<I')
+GAME_OVER = struct.Struct('<II')
+
+TAIL_REMOVED = 1
+FOOD_CHANGED = 2
+SPECIAL_FOOD_CHANGED = 4
+SCORE_CHANGED = 8
+
+NO_FOOD = (-1, -1)
+
+def frame(kind, payload):
+    return FRAME_HEADER.pack(len(payload) + 1, ord(kind)) + payload
+
+class SnakeBroadcaster:
+    """Tick listener for SnakeGame that turns each move into a frame for the server."""
+
+    def __init__(self, server, keyframe_interval=100):
+        self.server = server
+        self.keyframe_interval = keyframe_interval
+        self.tick = 0
+        self.last_keyframe = 0
+        self.length = 0
+        self.food = None
+        self.special_food = None
+        self.score = 0
+
+    def __call__(self, game, event):
+        if event == "game_over":
+            self.server.publish(frame('G', GAME_OVER.pack(self.tick, game.score)))
+            return
+        # Every keyframe and delta gets its own tick number
+        self.tick += 1
+        if event == "new_game" or self.tick - self.last_keyframe >= self.keyframe_interval:
+            self.server.publish(self.keyframe(game), self.tick, keyframe=True)
+        else:
+            self.server.publish(self.delta(game), self.tick)
+
+    def keyframe(self, game):
+        self.last_keyframe = self.tick
+        self.length = len(game.snake)
+        self.food, self.special_food, self.score = game.food, game.special_food, game.score
+        cells = [coordinate for segment in game.snake for coordinate in segment]
+        payload = KEYFRAME.pack(self.tick, game.width, game.height, game.score,
+                                *(game.food or NO_FOOD), *(game.special_food or NO_FOOD), len(game.snake))
+        return frame('K', payload + struct.pack(f'<{len(cells)}h', *cells))
+
+    def delta(self, game):
+        flags = 0
+        extra = b''
+        if len(game.snake) == self.length:
+            flags |= TAIL_REMOVED
+        if game.food != self.food:
+            flags |= FOOD_CHANGED
+            extra += POINT.pack(*(game.food or NO_FOOD))
+        if game.special_food != self.special_food:
+            flags |= SPECIAL_FOOD_CHANGED
+            extra += POINT.pack(*(game.special_food or NO_FOOD))
+        if game.score != self.score:
+            flags |= SCORE_CHANGED
+            extra += SCORE.pack(game.score)
+        self.length = len(game.snake)
+        self.food, self.special_food, self.score = game.food, game.special_food, game.score
+        return frame('D', DELTA.pack(self.tick, *game.snake[0], flags) + extra)
+
+class Spectator:
+    def __init__(self, writer):
+        self.writer = writer
+        self.transport = writer.transport
+        # Set when frames had to be dropped; the spectator then waits for the next keyframe
+        self.stale = False
+
+class SpectatorServer:
+    """Fans frames out to every connected spectator. publish() may be called from any thread."""
+
+    def __init__(self, host='127.0.0.1', port=8766, high_water=256 * 1024, track_latency=False):
+        self.host = host
+        self.port = port
+        self.high_water = high_water
+        self.spectators = set()
+        self.keyframe = None
+        self.backlog = []
+        self.loop = None
+        self.server = None
+        # tick -> publish time, for latency measurement only; it grows by one entry per tick
+        self.publish_times = {} if track_latency else None
+        self.frames_published = 0
+        self.bytes_published = 0
+        self.bytes_sent = 0
+        self.frames_dropped = 0
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_spectator, self.host, self.port, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for spectator in list(self.spectators):
+            spectator.writer.close()
+        await self.server.wait_closed()
+
+    async def handle_spectator(self, reader, writer):
+        spectator = Spectator(writer)
+        if self.keyframe:
+            catch_up = self.keyframe + b''.join(self.backlog)
+            writer.write(catch_up)
+            self.bytes_sent += len(catch_up)
+        self.spectators.add(spectator)
+        try:
+            # Spectators never send anything; discard whatever arrives until they hang up
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.spectators.discard(spectator)
+            writer.close()
+
+    def publish(self, data, tick=None, keyframe=False):
+        if tick is not None and self.publish_times is not None:
+            self.publish_times[tick] = time.perf_counter()
+        self.loop.call_soon_threadsafe(self.broadcast, data, keyframe)
+
+    def broadcast(self, data, keyframe):
+        if keyframe:
+            self.keyframe, self.backlog = data, []
+        else:
+            self.backlog.append(data)
+        self.frames_published += 1
+        self.bytes_published += len(data)
+        for spectator in self.spectators:
+            if spectator.stale:
+                if not keyframe:
+                    continue
+                spectator.stale = False
+            if spectator.transport.get_write_buffer_size() > self.high_water:
+                spectator.stale = True
+                self.frames_dropped += 1
+                continue
+            spectator.transport.write(data)
+            self.bytes_sent += len(data)
+
+class SpectatorView:
+    """Client-side copy of the game rebuilt from frames."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.synced = False
+        self.snake = deque()
+        self.food = None
+        self.special_food = None
+        self.score = 0
+        self.tick = 0
+        self.game_over = False
+
+    def feed(self, data):
+        """Apply received bytes; returns the ticks of the keyframes and deltas among them."""
+        self.buffer += data
+        ticks = []
+        offset = 0
+        while len(self.buffer) - offset >= FRAME_HEADER.size:
+            length, kind = FRAME_HEADER.unpack_from(self.buffer, offset)
+            if len(self.buffer) - offset < 4 + length:
+                break
+            payload = memoryview(self.buffer)[offset + FRAME_HEADER.size:offset + 4 + length]
+            kind = chr(kind)
+            self.apply(kind, payload)
+            payload.release()
+            offset += 4 + length
+            if self.synced and kind != 'G':
+                ticks.append(self.tick)
+        del self.buffer[:offset]
+        return ticks
+
+    def apply(self, kind, payload):
+        if kind == 'K':
+            (self.tick, self.width, self.height, self.score, food_x, food_y,
+             special_x, special_y, length) = KEYFRAME.unpack_from(payload)
+            cells = struct.unpack_from(f'<{2 * length}h', payload, KEYFRAME.size)
+            self.snake = deque(zip(cells[0::2], cells[1::2]))
+            self.food = (food_x, food_y) if food_x >= 0 else None
+            self.special_food = (special_x, special_y) if special_x >= 0 else None
+            self.synced = True
+            self.game_over = False
+        elif kind == 'D' and self.synced:
+            self.tick, head_x, head_y, flags = DELTA.unpack_from(payload)
+            self.snake.appendleft((head_x, head_y))
+            if flags & TAIL_REMOVED:
+                self.snake.pop()
+            offset = DELTA.size
+            if flags & FOOD_CHANGED:
+                x, y = POINT.unpack_from(payload, offset)
+                self.food = (x, y) if x >= 0 else None
+                offset += POINT.size
+            if flags & SPECIAL_FOOD_CHANGED:
+                x, y = POINT.unpack_from(payload, offset)
+                self.special_food = (x, y) if x >= 0 else None
+                offset += POINT.size
+            if flags & SCORE_CHANGED:
+                self.score, = SCORE.unpack_from(payload, offset)
+        elif kind == 'G' and self.synced:
+            self.tick, self.score = GAME_OVER.unpack_from(payload)
+            self.game_over = True
+
+def steer(game):
+    """Simple autopilot for demo and load-test games: head for food without hitting anything."""
+    head_x, head_y = game.snake[0]
+    target = game.special_food or game.food or (head_x, head_y)
+    steps = {"Up": (0, -1), "Down": (0, 1), "Left": (-1, 0), "Right": (1, 0)}
+    opposites = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
+    body = set(game.snake)
+
+    def preference(direction):
+        dx, dy = steps[direction]
+        return abs(head_x + dx - target[0]) + abs(head_y + dy - target[1])
+
+    for direction in sorted(steps, key=preference):
+        if direction == opposites[game.direction]:
+            continue
+        dx, dy = steps[direction]
+        x, y = head_x + dx, head_y + dy
+        if 0 <= x < game.width and 0 <= y < game.height and (x, y) not in body:
+            game.change_direction(direction)
+            return
+
+async def spectate(host, port, on_ticks, stop):
+    view = SpectatorView()
+    view.connected_at = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while not stop.is_set():
+            data = await reader.read(65536)
+            if not data:
+                break
+            ticks = view.feed(data)
+            if ticks:
+                on_ticks(view, ticks)
+    finally:
+        writer.close()
+    return view
+
+async def load_test(spectators=2000, ticks=500, tick_ms=20, width=60, height=40, keyframe_interval=100):
+    import resource  # Unix only, so serve and watch do not depend on it
+    # Every spectator needs a socket on both ends of the connection
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = 2 * spectators + 64
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+    server = SpectatorServer(port=0, track_latency=True)
+    await server.start()
+    game = SnakeGame(width, height, headless=True)
+    game.tick_listeners.append(SnakeBroadcaster(server, keyframe_interval))
+
+    latencies = []
+    last_delivery = {}
+
+    def on_ticks(view, completed):
+        now = time.perf_counter()
+        for tick in completed:
+            published = server.publish_times[tick]
+            if published < view.connected_at:
+                continue  # catch-up from the keyframe backlog, not live fan-out
+            latency = now - published
+            latencies.append(latency)
+            if latency > last_delivery.get(tick, 0.0):
+                last_delivery[tick] = latency
+
+    stop = asyncio.Event()
+    tasks = []
+
+    async def connect(count):
+        for _ in range(count):
+            tasks.append(asyncio.ensure_future(spectate('127.0.0.1', server.port, on_ticks, stop)))
+            await asyncio.sleep(0)
+
+    # Half the audience is there from the start, the rest joins mid-game and has to catch up
+    await connect(spectators // 2)
+    await asyncio.sleep(0.5)
+    game.new_game()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if tick == ticks // 4:
+            await connect(spectators - spectators // 2)
+        if not game.game_running:
+            game.new_game()
+        steer(game)
+        game.move_snake()
+        await asyncio.sleep(tick_ms / 1000)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(1.0)
+    stop.set()
+
+    await server.stop()
+    views = await asyncio.gather(*tasks, return_exceptions=True)
+    views = [view for view in views if isinstance(view, SpectatorView)]
+    in_sync = sum(1 for view in views if list(view.snake) == game.snake and view.score == game.score)
+
+    latencies.sort()
+    spreads = sorted(last_delivery.values())
+    frames = max(server.frames_published, 1)
+    print(f"{spectators} spectators, {ticks} ticks in {elapsed:.1f} s, {server.frames_published} frames published")
+    print(f"frame size: {server.bytes_published / frames:.1f} bytes average, "
+          f"full snapshot of the final snake would be {KEYFRAME.size + 5 + 4 * len(game.snake)} bytes")
+    print(f"bandwidth: {server.bytes_sent / frames / 1024:.1f} KiB sent per tick across all spectators, "
+          f"{server.bytes_sent / 1024 / 1024:.1f} MiB total, {server.frames_dropped} frames dropped for slow readers")
+    if latencies:
+        print(f"fan-out latency per delivery: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+        print(f"time until the last spectator has a tick: p50 {spreads[len(spreads) // 2] * 1000:.2f} ms, "
+              f"p99 {spreads[int(len(spreads) * 0.99)] * 1000:.2f} ms")
+    print(f"{in_sync}/{len(views)} spectators ended in sync with the game")
+
+async def watch(host, port):
+    stop = asyncio.Event()
+
+    def on_ticks(view, ticks):
+        status = "game over" if view.game_over else f"length {len(view.snake)}"
+        print(f"tick {view.tick}: score {view.score}, {status}")
+
+    await spectate(host, port, on_ticks, stop)
+
+def serve(port, width, height, cell_size, renderer, autopilot):
+    """Run a normal windowed game and broadcast it; the asyncio server lives on its own thread."""
+    server = SpectatorServer(port=port)
+    ready = threading.Event()
+
+    def run_server():
+        async def main():
+            await server.start()
+            ready.set()
+            await asyncio.Event().wait()
+        asyncio.run(main())
+
+    threading.Thread(target=run_server, daemon=True).start()
+    ready.wait()
+    print(f"Broadcasting on 127.0.0.1:{server.port}")
+    game = SnakeGame(width, height, cell_size, renderer)
+    game.tick_listeners.append(SnakeBroadcaster(server))
+    if autopilot:
+        game.tick_listeners.append(lambda game, event: steer(game) if event == "tick" else None)
+    game.run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Broadcast Snake games to spectators")
+    parser.add_argument("mode", choices=["serve", "watch", "load-test"])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--width", type=int, default=60)
+    parser.add_argument("--height", type=int, default=40)
+    parser.add_argument("--cell-size", type=int, default=20)
+    parser.add_argument("--renderer", default="canvas")
+    parser.add_argument("--autopilot", action="store_true", help="let the computer steer the served game")
+    parser.add_argument("--spectators", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--tick-ms", type=int, default=20)
+    parser.add_argument("--keyframe-interval", type=int, default=100)
+    args = parser.parse_args()
+    if args.mode == "serve":
+        serve(args.port, args.width, args.height, args.cell_size, args.renderer, args.autopilot)
+    elif args.mode == "watch":
+        asyncio.run(watch('127.0.0.1', args.port))
+    else:
+        asyncio.run(load_test(args.spectators, args.ticks, args.tick_ms, args.width, args.height,
+                              args.keyframe_interval))
\ No newline at end of file
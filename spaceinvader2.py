@@ -1,27 +1,72 @@
 import pygame
+import os
 import random
 import math
-from dataclasses import dataclass
-from typing import List, Tuple
+import time
+import argparse
+import csv
+import json
+import hashlib
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import List, NamedTuple, Optional, Tuple
 
-@dataclass
+@dataclass(frozen=True)
 class GameConfig:
-    SCREEN_WIDTH = 800
-    SCREEN_HEIGHT = 600
-    FPS = 60
-    PLAYER_SPEED = 5
-    BULLET_SPEED = 7
-    ENEMY_SPEED = 2
-    ENEMY_DROP = 30
-    ENEMY_ROWS = 3
-    ENEMIES_PER_ROW = 8
-    BONUS_SPAWN_CHANCE = 0.002
-    POWER_UP_DURATION = 300
+    """Settings for one game; each Game and its entities share a single instance."""
+    SCREEN_WIDTH: int = 800
+    SCREEN_HEIGHT: int = 600
+    FPS: int = 60
+    PLAYER_SPEED: float = 5
+    BULLET_SPEED: float = 7
+    ENEMY_SPEED: float = 2
+    ENEMY_SPEED_PER_LEVEL: float = 0.5
+    ENEMY_DROP: int = 30
+    ENEMY_ROWS: int = 3
+    ENEMIES_PER_ROW: int = 8
+    BONUS_SPAWN_CHANCE: float = 0.002
+    POWER_UP_DURATION: int = 300
+    BULLET_POOL_SIZE: int = 64
+    POWER_UP_POOL_SIZE: int = 8
+    USE_SPRITE_CACHE: bool = True
+    ENEMY_ANIMATION_FRAMES: int = 16
+    TEXT_CACHE_SIZE: int = 256
+    DIRTY_RECTS: bool = False
+    DIRTY_RECT_MAX_COVERAGE: float = 0.4  # fraction of the screen above which a full flip is cheaper
+    BACKGROUND_COLOR: Tuple[int, int, int] = (0, 0, 20)
+    PROFILER_WINDOW: int = 300  # frames kept for rolling percentiles
+    PROFILER_OVERLAY_REFRESH: int = 15  # frames between overlay text re-renders
+
+    # Settings that change how a game looks or is paced on screen, never how it plays out
+    DISPLAY_FIELDS = frozenset({'FPS', 'USE_SPRITE_CACHE', 'ENEMY_ANIMATION_FRAMES', 'TEXT_CACHE_SIZE', 'DIRTY_RECTS',
+                                'DIRTY_RECT_MAX_COVERAGE', 'BACKGROUND_COLOR', 'PROFILER_WINDOW',
+                                'PROFILER_OVERLAY_REFRESH'})
+
+    def for_level(self, level: int) -> 'GameConfig':
+        return replace(self, ENEMY_SPEED=self.ENEMY_SPEED + self.ENEMY_SPEED_PER_LEVEL * (level - 1))
+
+    def same_rules(self, other: 'GameConfig') -> bool:
+        """True if other simulates identically, whatever its display settings."""
+        return all(getattr(self, field.name) == getattr(other, field.name)
+                   for field in fields(self) if field.name not in self.DISPLAY_FIELDS)
+
+# Bit flags for one frame of player input, as passed to Game.step()
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_FIRE = 4
 
 class GameObject:
+    # Pixels the drawn shape can extend past (x, y, width, height) on each side
+    DRAW_MARGIN = (0, 0)
+
     def __init__(self, x: float, y: float, width: int, height: int, speed: float, color: Tuple[int, int, int]):
         self.x = x
         self.y = y
+        # Position at the start of the current frame, for swept collision tests
+        self.prev_x = x
+        self.prev_y = y
         self.width = width
         self.height = height
         self.speed = speed
@@ -30,37 +75,174 @@ class GameObject:
     def get_rect(self) -> pygame.Rect:
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
+    def get_previous_rect(self) -> pygame.Rect:
+        return pygame.Rect(self.prev_x, self.prev_y, self.width, self.height)
+
+    def save_position(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def get_draw_rect(self) -> pygame.Rect:
+        margin_x, margin_y = self.DRAW_MARGIN
+        return pygame.Rect(int(self.x) - margin_x, int(self.y) - margin_y,
+                           self.width + 2 * margin_x, self.height + 2 * margin_y)
+
+    @classmethod
+    def draw_rect_at(cls, x: float, y: float) -> pygame.Rect:
+        """get_draw_rect() for an entity of this class's standard size at (x, y)."""
+        margin_x, margin_y = cls.DRAW_MARGIN
+        return pygame.Rect(int(x) - margin_x, int(y) - margin_y,
+                           cls.WIDTH + 2 * margin_x, cls.HEIGHT + 2 * margin_y)
+
+def swept_hit_time(rect: pygame.Rect, dx: int, dy: int, target: pygame.Rect):
+    """Earliest fraction of a move by (dx, dy) at which rect overlaps target, or None.
+
+    Uses the same open-interval overlap as Rect.colliderect, so a move that
+    ends overlapping the target always counts as a hit.
+    """
+    enter, leave = 0.0, 1.0
+    for start, end, velocity, target_start, target_end in (
+            (rect.left, rect.right, dx, target.left, target.right),
+            (rect.top, rect.bottom, dy, target.top, target.bottom)):
+        if velocity == 0:
+            if start >= target_end or end <= target_start:
+                return None
+            continue
+        if velocity > 0:
+            axis_enter = (target_start - end) / velocity
+            axis_leave = (target_end - start) / velocity
+        else:
+            axis_enter = (target_end - start) / velocity
+            axis_leave = (target_start - end) / velocity
+        enter = max(enter, axis_enter)
+        leave = min(leave, axis_leave)
+    # Overlap holds strictly between enter and leave; at t == 1 it must be inside
+    if enter < leave and enter < 1.0 and leave > 0.0:
+        return enter
+    return None
+
+class ObjectPool:
+    """Fixed-capacity pool of preallocated objects handed out from a free list."""
+
+    def __init__(self, factory, capacity: int):
+        self.capacity = capacity
+        self.items = [factory() for _ in range(capacity)]
+        self.free = self.items[::-1]
+        self.high_water = 0
+        self.allocations = 0  # acquisitions since the last begin_frame()
+        self.total_allocations = 0
+        self.exhausted = 0  # acquisitions refused because the pool was empty
+
+    @property
+    def in_use(self) -> int:
+        return self.capacity - len(self.free)
+
+    def acquire(self, x: float, y: float, *args):
+        if not self.free:
+            self.exhausted += 1
+            return None
+        obj = self.free.pop()
+        obj.reset(x, y, *args)
+        obj.active = True
+        self.allocations += 1
+        self.total_allocations += 1
+        in_use = self.capacity - len(self.free)
+        if in_use > self.high_water:
+            self.high_water = in_use
+        return obj
+
+    def release(self, obj):
+        if obj.active:
+            obj.active = False
+            self.free.append(obj)
+
+    def release_all(self):
+        for obj in self.items:
+            obj.active = False
+        self.free = self.items[::-1]
+
+    def begin_frame(self):
+        self.allocations = 0
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'in_use': self.in_use,
+            'high_water': self.high_water,
+            'allocations': self.allocations,
+            'total_allocations': self.total_allocations,
+            'exhausted': self.exhausted
+        }
+
 class Bullet(GameObject):
-    def __init__(self, x: float, y: float):
-        super().__init__(x, y, 4, 12, GameConfig.BULLET_SPEED, (255, 200, 0))
+    DRAW_MARGIN = (2, 0)
+    WIDTH = 4
+    HEIGHT = 12
+    COLOR = (255, 200, 0)
+
+    def __init__(self, x: float, y: float, config: GameConfig):
+        super().__init__(x, y, self.WIDTH, self.HEIGHT, config.BULLET_SPEED, self.COLOR)
+        self.config = config
+        self.active = False
+
+    def reset(self, x: float, y: float):
+        self.x = x
+        self.y = y
+        self.save_position()
+        self.speed = self.config.BULLET_SPEED
 
     def draw(self, screen):
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
-        pygame.draw.circle(screen, (255, 220, 100), (int(self.x + self.width/2), int(self.y + self.height/2)), 4)
+        self.draw_shape(screen, self.x, self.y, self.width, self.height, self.color)
+
+    @staticmethod
+    def draw_shape(surface, x, y, width, height, color):
+        pygame.draw.rect(surface, color, (x, y, width, height))
+        pygame.draw.circle(surface, (255, 220, 100), (int(x + width/2), int(y + height/2)), 4)
 
     def update(self):
+        self.save_position()
         self.y -= self.speed
 
 class PowerUp(GameObject):
-    def __init__(self, x, y):
-        super().__init__(x, y, 20, 20, 2, (255, 255, 255))
-        self.type = random.choice(['double_shot', 'speed_up', 'shield'])
-        self.colors = {
-            'double_shot': (255, 215, 0),
-            'speed_up': (0, 255, 255),
-            'shield': (147, 112, 219)
-        }
-        self.color = self.colors[self.type]
+    WIDTH = 20
+    HEIGHT = 20
+    TYPES = ['double_shot', 'speed_up', 'shield']
+    COLORS = {
+        'double_shot': (255, 215, 0),
+        'speed_up': (0, 255, 255),
+        'shield': (147, 112, 219)
+    }
+
+    def __init__(self, x, y, config: GameConfig, power_up_type=None):
+        super().__init__(x, y, self.WIDTH, self.HEIGHT, 2, (255, 255, 255))
+        self.config = config
+        self.active = False
+        self.reset(x, y, power_up_type)
+
+    def reset(self, x, y, power_up_type=None):
+        self.x = x
+        self.y = y
+        self.save_position()
+        # Pooled power-ups get a placeholder type; the game picks the real one when it acquires them
+        self.type = power_up_type or self.TYPES[0]
+        self.color = self.COLORS[self.type]
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
 
     def update(self):
+        self.save_position()
         self.y += self.speed
 
 class Player(GameObject):
-    def __init__(self, x, y):
-        super().__init__(x, y, 60, 80, GameConfig.PLAYER_SPEED, (50, 150, 50))
+    DRAW_MARGIN = (15, 5)
+    WIDTH = 60
+    HEIGHT = 80
+
+    def __init__(self, x, y, config: GameConfig, bullet_pool: ObjectPool):
+        super().__init__(x, y, self.WIDTH, self.HEIGHT, config.PLAYER_SPEED, (50, 150, 50))
+        self.config = config
+        self.bullet_pool = bullet_pool
         self.bullets = []
         self.shoot_cooldown = 0
         self.double_shot = False
@@ -69,33 +251,46 @@ class Player(GameObject):
         self.current_power_up = None
 
     def draw(self, screen):
+        self.draw_shape(screen, self.x, self.y, self.width, self.height, self.shield)
+
+    @staticmethod
+    def draw_shape(surface, x, y, width, height, shield):
         # Body
-        pygame.draw.rect(screen, (70, 70, 70), (self.x + 20, self.y + 30, 20, 30))
+        pygame.draw.rect(surface, (70, 70, 70), (x + 20, y + 30, 20, 30))
         # Head
-        pygame.draw.circle(screen, (200, 150, 150), (self.x + 30, self.y + 20), 10)
+        pygame.draw.circle(surface, (200, 150, 150), (x + 30, y + 20), 10)
         # Arms
-        pygame.draw.rect(screen, (70, 70, 70), (self.x + 10, self.y + 35, 10, 20))
-        pygame.draw.rect(screen, (70, 70, 70), (self.x + 40, self.y + 35, 10, 20))
+        pygame.draw.rect(surface, (70, 70, 70), (x + 10, y + 35, 10, 20))
+        pygame.draw.rect(surface, (70, 70, 70), (x + 40, y + 35, 10, 20))
         # Gun
-        pygame.draw.rect(screen, (100, 100, 100), (self.x + 35, self.y + 25, 25, 8))
+        pygame.draw.rect(surface, (100, 100, 100), (x + 35, y + 25, 25, 8))
         # Shield effect
-        if self.shield:
-            pygame.draw.circle(screen, (147, 112, 219, 128), 
-                             (int(self.x + self.width/2), int(self.y + self.height/2)), 
+        if shield:
+            pygame.draw.circle(surface, (147, 112, 219, 128), 
+                             (int(x + width/2), int(y + height/2)), 
                              45, 2)
 
     def move(self, direction: int):
         new_x = self.x + (direction * self.speed)
-        if 0 <= new_x <= GameConfig.SCREEN_WIDTH - self.width:
+        if 0 <= new_x <= self.config.SCREEN_WIDTH - self.width:
             self.x = new_x
 
+    def fire_bullet(self, x: float, y: float):
+        bullet = self.bullet_pool.acquire(x, y)
+        if bullet is not None:
+            self.bullets.append(bullet)
+
+    def remove_bullet(self, bullet: Bullet):
+        self.bullets.remove(bullet)
+        self.bullet_pool.release(bullet)
+
     def shoot(self):
         if self.shoot_cooldown == 0:
             if self.double_shot:
-                self.bullets.append(Bullet(self.x + 45, self.y + 29))
-                self.bullets.append(Bullet(self.x + 65, self.y + 29))
+                self.fire_bullet(self.x + 45, self.y + 29)
+                self.fire_bullet(self.x + 65, self.y + 29)
             else:
-                self.bullets.append(Bullet(self.x + 55, self.y + 29))
+                self.fire_bullet(self.x + 55, self.y + 29)
             self.shoot_cooldown = 15
 
     def update(self):
@@ -107,198 +302,785 @@ class Player(GameObject):
             if self.power_up_timer == 0:
                 self.disable_power_ups()
         
-        for bullet in self.bullets[:]:
+        # Rebuild the list instead of calling remove() once per dead bullet.
+        # A bullet is only dropped once it started the frame above the screen,
+        # so the collision check still sees the on-screen part of its path.
+        alive = []
+        for bullet in self.bullets:
             bullet.update()
-            if bullet.y < 0:
-                self.bullets.remove(bullet)
+            if bullet.prev_y < 0:
+                self.bullet_pool.release(bullet)
+            else:
+                alive.append(bullet)
+        self.bullets = alive
 
     def activate_power_up(self, power_up_type):
         self.current_power_up = power_up_type
-        self.power_up_timer = GameConfig.POWER_UP_DURATION
+        self.power_up_timer = self.config.POWER_UP_DURATION
         
         if power_up_type == 'double_shot':
             self.double_shot = True
         elif power_up_type == 'speed_up':
-            self.speed = GameConfig.PLAYER_SPEED * 1.5
+            self.speed = self.config.PLAYER_SPEED * 1.5
         elif power_up_type == 'shield':
             self.shield = True
 
     def disable_power_ups(self):
         self.double_shot = False
         self.shield = False
-        self.speed = GameConfig.PLAYER_SPEED
+        self.speed = self.config.PLAYER_SPEED
         self.current_power_up = None
 
 class Enemy(GameObject):
-    def __init__(self, x: float, y: float):
-        super().__init__(x, y, 40, 40, GameConfig.ENEMY_SPEED, (200, 50, 50))
-        self.direction = 1
-        self.animation_phase = 0
-        self.animation_speed = 0.1
+    DRAW_MARGIN = (1, 3)
+    WIDTH = 40
+    HEIGHT = 40
+    COLOR = (200, 50, 50)
 
-    def draw(self, screen):
-        self.animation_phase += self.animation_speed
-        wave_offset = math.sin(self.animation_phase) * 3
-        
+    def __init__(self, formation: 'Formation', row: int, col: int):
+        # Position, previous position and speed all come from the formation,
+        # so GameObject.__init__'s assignments do not apply; only the slot
+        # offset is stored
+        self.formation = formation
+        self.row = row
+        self.col = col
+        self.local_x = col * Formation.SPACING_X
+        self.local_y = row * Formation.SPACING_Y
+        self.width = self.WIDTH
+        self.height = self.HEIGHT
+        self.color = self.COLOR
+
+    @property
+    def x(self) -> float:
+        return self.formation.x + self.local_x
+
+    @property
+    def y(self) -> float:
+        return self.formation.y + self.local_y
+
+    @property
+    def prev_x(self) -> float:
+        return self.formation.prev_x + self.local_x
+
+    @property
+    def prev_y(self) -> float:
+        return self.formation.prev_y + self.local_y
+
+    @property
+    def speed(self) -> float:
+        return self.formation.speed
+
+    def save_position(self):
+        # Formation.update records the previous position for every slot at once
+        pass
+
+    @staticmethod
+    def draw_shape(surface, x, y, color, wave_offset):
         points = [
-            (self.x + 20, self.y + wave_offset),
-            (self.x, self.y + 20),
-            (self.x + 40, self.y + 20),
-            (self.x + 35, self.y + 40),
-            (self.x + 5, self.y + 40)
+            (x + 20, y + wave_offset),
+            (x, y + 20),
+            (x + 40, y + 20),
+            (x + 35, y + 40),
+            (x + 5, y + 40)
         ]
-        pygame.draw.polygon(screen, self.color, points)
+        pygame.draw.polygon(surface, color, points)
         
         # Eyes
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x + 15), int(self.y + 15)), 5)
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x + 25), int(self.y + 15)), 5)
-        pygame.draw.circle(screen, (0, 0, 0), (int(self.x + 15), int(self.y + 15)), 2)
-        pygame.draw.circle(screen, (0, 0, 0), (int(self.x + 25), int(self.y + 15)), 2)
-
-    def move(self, drop: bool = False):
-        if drop:
-            self.y += GameConfig.ENEMY_DROP
+        pygame.draw.circle(surface, (255, 255, 255), (int(x + 15), int(y + 15)), 5)
+        pygame.draw.circle(surface, (255, 255, 255), (int(x + 25), int(y + 15)), 5)
+        pygame.draw.circle(surface, (0, 0, 0), (int(x + 15), int(y + 15)), 2)
+        pygame.draw.circle(surface, (0, 0, 0), (int(x + 25), int(y + 15)), 2)
+
+class Formation:
+    """The enemy grid, moved as a single block.
+
+    Enemies only store their slot's offset from the formation origin, so
+    moving, dropping and edge-checking the whole grid is O(1) however many
+    slots it has. Per-slot alive flags plus live-row/column counts keep the
+    bounds of the surviving enemies current as they die.
+    """
+
+    SPACING_X = 80
+    SPACING_Y = 60
+    ORIGIN = (100, 50)
+
+    def __init__(self, config: GameConfig):
+        self.config = config
+        self.rows = config.ENEMY_ROWS
+        self.cols = config.ENEMIES_PER_ROW
+        self.x, self.y = self.ORIGIN
+        self.prev_x, self.prev_y = self.ORIGIN
+        self.speed = config.ENEMY_SPEED
+        self.direction = 1
+        self.animation_phase = 0
+        self.animation_speed = 0.1
+
+        self.slots = [Enemy(self, row, col) for row in range(self.rows) for col in range(self.cols)]
+        self.alive = [True] * len(self.slots)
+        self.enemies = list(self.slots)
+        self.row_counts = [self.cols] * self.rows
+        self.col_counts = [self.rows] * self.cols
+        self.min_row, self.max_row = 0, self.rows - 1
+        self.min_col, self.max_col = 0, self.cols - 1
+
+    def update(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.animation_phase += self.animation_speed
+        if not self.enemies:
+            return
+        left = self.x + self.min_col * self.SPACING_X
+        right = self.x + self.max_col * self.SPACING_X
+        if (left <= 0 and self.direction < 0) or \
+           (right >= self.config.SCREEN_WIDTH - Enemy.WIDTH and self.direction > 0):
+            self.direction *= -1
+            self.y += self.config.ENEMY_DROP
         else:
             self.x += self.speed * self.direction
 
+    def kill(self, enemy: Enemy):
+        index = enemy.row * self.cols + enemy.col
+        if not self.alive[index]:
+            return
+        self.alive[index] = False
+        self.enemies.remove(enemy)
+        self.row_counts[enemy.row] -= 1
+        self.col_counts[enemy.col] -= 1
+        if not self.enemies:
+            return
+        while not self.row_counts[self.min_row]:
+            self.min_row += 1
+        while not self.row_counts[self.max_row]:
+            self.max_row -= 1
+        while not self.col_counts[self.min_col]:
+            self.min_col += 1
+        while not self.col_counts[self.max_col]:
+            self.max_col -= 1
+
+    def live_slots(self, left: float, top: float, right: float, bottom: float):
+        """Yield live enemies, in row-major order, whose slots a formation-space box spans."""
+        first_col = max(self.min_col, int(left // self.SPACING_X))
+        last_col = min(self.max_col, int(right // self.SPACING_X))
+        first_row = max(self.min_row, int(top // self.SPACING_Y))
+        last_row = min(self.max_row, int(bottom // self.SPACING_Y))
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                index = row * self.cols + col
+                if self.alive[index]:
+                    yield self.slots[index]
+
+    def collide(self, rect: pygame.Rect):
+        """Return the first live enemy (in row-major order) overlapping rect, or None."""
+        if not self.enemies:
+            return None
+        # Map the rect into formation space once and only test the slots it spans
+        local_x = rect.x - self.x
+        local_y = rect.y - self.y
+        for enemy in self.live_slots(local_x, local_y, local_x + rect.width, local_y + rect.height):
+            if rect.colliderect(enemy.get_rect()):
+                return enemy
+        return None
+
+    def sweep(self, start: pygame.Rect, end: pygame.Rect):
+        """Return the first live enemy hit by a box moving from start to end this frame, or None.
+
+        Motion is taken relative to the formation's own move this frame, so
+        fast projectiles cannot tunnel through an enemy between frames.
+        """
+        if not self.enemies:
+            return None
+        # Bound the whole path in formation space (1px slack for int truncation)
+        left = min(start.left - self.prev_x, end.left - self.x) - 1
+        top = min(start.top - self.prev_y, end.top - self.y) - 1
+        right = max(start.right - self.prev_x, end.right - self.x) + 1
+        bottom = max(start.bottom - self.prev_y, end.bottom - self.y) + 1
+        move_x = end.x - start.x
+        move_y = end.y - start.y
+        hit, hit_time = None, None
+        for enemy in self.live_slots(left, top, right, bottom):
+            enemy_start = enemy.get_previous_rect()
+            enemy_end = enemy.get_rect()
+            t = swept_hit_time(start, move_x - (enemy_end.x - enemy_start.x),
+                               move_y - (enemy_end.y - enemy_start.y), enemy_start)
+            if t is not None and (hit_time is None or t < hit_time):
+                hit, hit_time = enemy, t
+        return hit
+
+class PlayerView(NamedTuple):
+    x: float
+    y: float
+    shield: bool
+    current_power_up: Optional[str]
+    power_up_timer: int
+
+class BulletView(NamedTuple):
+    x: float
+    y: float
+
+class PowerUpView(NamedTuple):
+    x: float
+    y: float
+    type: str
+
+class FormationView(NamedTuple):
+    x: float
+    y: float
+    animation_phase: float
+    enemies: Tuple[Enemy, ...]  # Enemy objects never change after creation, so they can be shared
+
+class FrameSnapshot(NamedTuple):
+    """Immutable copy of everything needed to draw one frame."""
+    frame: int
+    score: int
+    level: int
+    game_over: bool
+    win_condition: bool
+    player: PlayerView
+    bullets: Tuple[BulletView, ...]
+    formation: FormationView
+    power_ups: Tuple[PowerUpView, ...]
+
+class SpriteCache:
+    """Entity sprites and HUD text rendered once to Surfaces and blitted afterwards.
+
+    Must be built after pygame.display.set_mode() so the surfaces can be
+    converted to the display's pixel format.
+    """
+
+    def __init__(self, font, config: GameConfig):
+        self.font = font
+        self.config = config
+        self.text_cache = {}
+
+        # Each sprite covers the entity's draw rect, i.e. its size plus DRAW_MARGIN
+        player = Player(0, 0, config, None)
+        self.player = self.prerender(player,
+                                     lambda s, x, y: Player.draw_shape(s, x, y, player.width, player.height, False))
+        self.player_shielded = self.prerender(player,
+                                              lambda s, x, y: Player.draw_shape(s, x, y, player.width, player.height, True))
+
+        bullet = Bullet(0, 0, config)
+        self.bullet = self.prerender(bullet,
+                                     lambda s, x, y: Bullet.draw_shape(s, x, y, bullet.width, bullet.height, bullet.color))
+
+        # Wave animation is quantised to a fixed number of frames over one period
+        enemy = Formation(replace(config, ENEMY_ROWS=1, ENEMIES_PER_ROW=1)).slots[0]
+        self.enemy_frames = []
+        for i in range(config.ENEMY_ANIMATION_FRAMES):
+            wave_offset = math.sin(2 * math.pi * i / config.ENEMY_ANIMATION_FRAMES) * 3
+            self.enemy_frames.append(self.prerender(
+                enemy,
+                lambda s, x, y, w=wave_offset: Enemy.draw_shape(s, x, y, enemy.color, w)))
+
+        self.power_ups = {}
+        for power_up_type, color in PowerUp.COLORS.items():
+            surface = pygame.Surface((20, 20))
+            surface.fill(color)
+            self.power_ups[power_up_type] = (surface.convert(), 0, 0)
+
+    @staticmethod
+    def prerender(entity: GameObject, draw_shape):
+        margin_x, margin_y = entity.DRAW_MARGIN
+        surface = pygame.Surface((entity.width + 2 * margin_x, entity.height + 2 * margin_y), pygame.SRCALPHA)
+        draw_shape(surface, margin_x, margin_y)
+        return surface.convert_alpha(), -margin_x, -margin_y
+
+    @staticmethod
+    def blit(screen, sprite, x, y):
+        surface, offset_x, offset_y = sprite
+        screen.blit(surface, (int(x) + offset_x, int(y) + offset_y))
+
+    def draw_player(self, screen, player: PlayerView):
+        self.blit(screen, self.player_shielded if player.shield else self.player, player.x, player.y)
+
+    def draw_bullet(self, screen, bullet: BulletView):
+        self.blit(screen, self.bullet, bullet.x, bullet.y)
+
+    def draw_formation(self, screen, formation: FormationView):
+        frames = self.config.ENEMY_ANIMATION_FRAMES
+        frame = int(formation.animation_phase * frames / (2 * math.pi)) % frames
+        surface, offset_x, offset_y = self.enemy_frames[frame]
+        x = formation.x
+        y = formation.y
+        screen.blits([(surface, (int(x + enemy.local_x) + offset_x, int(y + enemy.local_y) + offset_y))
+                      for enemy in formation.enemies], False)
+
+    def draw_power_up(self, screen, power_up: PowerUpView):
+        self.blit(screen, self.power_ups[power_up.type], power_up.x, power_up.y)
+
+    def render_text(self, text: str, color: Tuple[int, int, int]):
+        key = (text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= self.config.TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            surface = self.font.render(text, True, color).convert_alpha()
+            self.text_cache[key] = surface
+        return surface
+
+class DirtyRectRenderer:
+    """Presents only the screen regions that changed since the previous frame.
+
+    Every frame the areas drawn last time are restored from the background,
+    the scene is drawn again, and the union of old and new areas is pushed
+    with pygame.display.update(). When those areas cover too much of the
+    screen a single full flip is used instead.
+    """
+
+    def __init__(self, screen, config: GameConfig):
+        self.screen = screen
+        self.config = config
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(config.BACKGROUND_COLOR)
+        self.screen_area = screen.get_width() * screen.get_height()
+        self.previous_rects = []
+        self.needs_full_redraw = True
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        self.needs_full_redraw = True
+
+    def begin_frame(self):
+        if self.needs_full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                self.screen.blit(self.background, rect, rect)
+
+    def present(self, drawn_rects: List[pygame.Rect]):
+        screen_rect = self.screen.get_rect()
+        current_rects = [rect.clip(screen_rect) for rect in drawn_rects]
+        dirty = self.previous_rects + current_rects
+        coverage = sum(rect.width * rect.height for rect in dirty)
+
+        if self.needs_full_redraw or coverage > self.screen_area * self.config.DIRTY_RECT_MAX_COVERAGE:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+
+        self.previous_rects = current_rects
+        self.needs_full_redraw = False
+
+class FrameProfiler:
+    """Per-phase frame timings with rolling percentiles and, if asked for, a per-frame trace."""
+
+    PHASES = ('handle_input', 'player.update', 'update_enemies', 'update_power_ups',
+              'check_collisions', 'check_win_condition', 'draw')
+    COUNTS = ('enemies', 'bullets', 'power_ups')
+
+    def __init__(self, config: GameConfig, keep_trace: bool = False):
+        self.config = config
+        self.samples = {phase: deque(maxlen=config.PROFILER_WINDOW) for phase in self.PHASES + ('total',)}
+        # The trace grows by one row per frame, so it is only kept when it will be exported
+        self.trace = [] if keep_trace else None
+        self.show_overlay = False
+        self.overlay = None
+        self.overlay_age = 0
+
+    def record(self, frame: int, timings, counts):
+        """Store one frame; timings are seconds in PHASES order, counts in COUNTS order."""
+        timings_ms = [t * 1000 for t in timings]
+        for phase, ms in zip(self.PHASES, timings_ms):
+            self.samples[phase].append(ms)
+        total = sum(timings_ms)
+        self.samples['total'].append(total)
+        if self.trace is not None:
+            self.trace.append((frame, *timings_ms, total, *counts))
+
+    @staticmethod
+    def percentile(sorted_samples, fraction: float) -> float:
+        if not sorted_samples:
+            return 0.0
+        index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+        return sorted_samples[index]
+
+    def summary(self) -> dict:
+        result = {}
+        for phase, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[phase] = {
+                'p50': self.percentile(ordered, 0.50),
+                'p95': self.percentile(ordered, 0.95),
+                'p99': self.percentile(ordered, 0.99)
+            }
+        return result
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.overlay = None
+
+    def draw_overlay(self, screen, font) -> pygame.Rect:
+        # Percentile text changes every frame, so re-render it only periodically
+        self.overlay_age += 1
+        if self.overlay is None or self.overlay_age >= self.config.PROFILER_OVERLAY_REFRESH:
+            self.overlay_age = 0
+            rows = [('phase (ms)', 'p50', 'p95', 'p99')]
+            for phase, stats in self.summary().items():
+                rows.append((phase, f"{stats['p50']:.2f}", f"{stats['p95']:.2f}", f"{stats['p99']:.2f}"))
+            # The default font is proportional, so lay the table out cell by cell
+            name_width, number_width = 140, 50
+            line_height = font.get_linesize()
+            self.overlay = pygame.Surface((name_width + 3 * number_width + 10,
+                                           line_height * len(rows) + 10), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 180))
+            for i, row in enumerate(rows):
+                y = 5 + i * line_height
+                self.overlay.blit(font.render(row[0], True, (200, 255, 200)), (5, y))
+                for j, cell in enumerate(row[1:]):
+                    surface = font.render(cell, True, (200, 255, 200))
+                    self.overlay.blit(surface, (5 + name_width + (j + 1) * number_width - surface.get_width(), y))
+        return screen.blit(self.overlay, (screen.get_width() - self.overlay.get_width() - 10, 50))
+
+    def export(self, path: str):
+        """Write the per-frame trace as CSV, or as JSON with a summary if path ends in .json."""
+        if self.trace is None:
+            raise RuntimeError("profiler was created without keep_trace")
+        header = ('frame',) + tuple(f"{phase}_ms" for phase in self.PHASES) + ('total_ms',) + self.COUNTS
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({
+                    'summary': self.summary(),
+                    'frames': [dict(zip(header, row)) for row in self.trace]
+                }, f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(self.trace)
+
 class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((GameConfig.SCREEN_WIDTH, GameConfig.SCREEN_HEIGHT))
-        pygame.display.set_caption("Space Invaders")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
+    def __init__(self, config: GameConfig = None, headless: bool = False, render: bool = True, seed=None,
+                 profile: bool = False, trace: bool = False):
+        """Create a game session.
+
+        config defaults to GameConfig(); it is never modified, so any number
+        of sessions can run side by side in one process. headless runs
+        without a window: with render=True frames are drawn through SDL's
+        dummy video driver, with render=False nothing is drawn and pygame's
+        display and font modules are never initialised. seed fixes the RNG
+        used for power-up spawns; when omitted one is picked at random and
+        kept in self.seed so the game can still be recorded. profile
+        attaches a FrameProfiler; without it step() takes no timings at all.
+        trace makes the profiler keep every frame for export().
+        """
+        self.base_config = config or GameConfig()
+        self.config = self.base_config
+        self.headless = headless
+        self.rendering = render
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recorder = None
+        self.frame = 0
+        self.screen = None
+        self.clock = None
+        self.font = None
+        self.sprites = None
+        self.dirty_renderer = None
+        self.profiler = FrameProfiler(self.config, keep_trace=trace) if profile else None
+        self.profiler_font = None
+
+        if render:
+            if headless:
+                os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            # Only video and fonts are used; pygame.init() would also bring up audio and joysticks
+            pygame.display.init()
+            pygame.font.init()
+            self.screen = pygame.display.set_mode((self.config.SCREEN_WIDTH, self.config.SCREEN_HEIGHT))
+            pygame.display.set_caption("Space Invaders")
+            self.clock = pygame.time.Clock()
+            self.font = pygame.font.Font(None, 36)
+            self.sprites = SpriteCache(self.font, self.config) if self.config.USE_SPRITE_CACHE else None
+            self.dirty_renderer = DirtyRectRenderer(self.screen, self.config) if self.config.DIRTY_RECTS else None
+            if profile:
+                self.profiler_font = pygame.font.Font(None, 20)
+
+        self.bullet_pool = ObjectPool(lambda: Bullet(0, 0, self.config), self.config.BULLET_POOL_SIZE)
+        self.power_up_pool = ObjectPool(lambda: PowerUp(0, 0, self.config), self.config.POWER_UP_POOL_SIZE)
         self.reset_game()
 
     def reset_game(self):
-        self.player = Player(GameConfig.SCREEN_WIDTH//2, GameConfig.SCREEN_HEIGHT - 100)
-        self.enemies = []
+        self.bullet_pool.release_all()
+        self.power_up_pool.release_all()
+        self.config = self.base_config
+        self.player = Player(self.config.SCREEN_WIDTH//2, self.config.SCREEN_HEIGHT - 100, self.config, self.bullet_pool)
+        self.frame = 0
         self.power_ups = []
         self.score = 0
         self.level = 1
         self.game_over = False
         self.win_condition = False
         self.setup_enemies()
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
 
     def setup_enemies(self):
-        for row in range(GameConfig.ENEMY_ROWS):
-            for col in range(GameConfig.ENEMIES_PER_ROW):
-                x = 100 + col * 80
-                y = 50 + row * 60
-                self.enemies.append(Enemy(x, y))
+        self.formation = Formation(self.config)
+
+    @property
+    def enemies(self) -> List[Enemy]:
+        return self.formation.enemies
 
-    def handle_input(self):
+    @property
+    def done(self) -> bool:
+        return self.game_over or self.win_condition
+
+    @staticmethod
+    def read_keyboard() -> int:
         keys = pygame.key.get_pressed()
+        actions = 0
         if keys[pygame.K_LEFT]:
-            self.player.move(-1)
+            actions |= ACTION_LEFT
         if keys[pygame.K_RIGHT]:
-            self.player.move(1)
+            actions |= ACTION_RIGHT
         if keys[pygame.K_SPACE]:
+            actions |= ACTION_FIRE
+        return actions
+
+    def handle_input(self, actions: int):
+        self.player.save_position()
+        if actions & ACTION_LEFT:
+            self.player.move(-1)
+        if actions & ACTION_RIGHT:
+            self.player.move(1)
+        if actions & ACTION_FIRE:
             self.player.shoot()
 
     def update_enemies(self):
-        move_down = False
-        for enemy in self.enemies:
-            if (enemy.x <= 0 and enemy.direction < 0) or \
-               (enemy.x >= GameConfig.SCREEN_WIDTH - enemy.width and enemy.direction > 0):
-                move_down = True
-                break
-
-        if move_down:
-            for enemy in self.enemies:
-                enemy.direction *= -1
-                enemy.move(drop=True)
-        else:
-            for enemy in self.enemies:
-                enemy.move()
+        self.formation.update()
 
     def update_power_ups(self):
-        if random.random() < GameConfig.BONUS_SPAWN_CHANCE:
-            x = random.randint(0, GameConfig.SCREEN_WIDTH - 20)
-            self.power_ups.append(PowerUp(x, 0))
+        if self.rng.random() < self.config.BONUS_SPAWN_CHANCE:
+            x = self.rng.randint(0, self.config.SCREEN_WIDTH - 20)
+            power_up = self.power_up_pool.acquire(x, 0, self.rng.choice(PowerUp.TYPES))
+            if power_up is not None:
+                self.power_ups.append(power_up)
 
-        for power_up in self.power_ups[:]:
+        # Sweep each pickup against the player's own move this frame
+        player_start = self.player.get_previous_rect()
+        player_end = self.player.get_rect()
+        player_move_x = player_end.x - player_start.x
+        player_move_y = player_end.y - player_start.y
+        alive = []
+        for power_up in self.power_ups:
             power_up.update()
-            if power_up.y > GameConfig.SCREEN_HEIGHT:
-                self.power_ups.remove(power_up)
-            elif power_up.get_rect().colliderect(self.player.get_rect()):
+            start = power_up.get_previous_rect()
+            end = power_up.get_rect()
+            if swept_hit_time(start, end.x - start.x - player_move_x, end.y - start.y - player_move_y,
+                              player_start) is not None:
                 self.player.activate_power_up(power_up.type)
-                self.power_ups.remove(power_up)
+                self.power_up_pool.release(power_up)
+            elif power_up.y > self.config.SCREEN_HEIGHT:
+                self.power_up_pool.release(power_up)
+            else:
+                alive.append(power_up)
+        self.power_ups = alive
 
     def check_collisions(self):
         for bullet in self.player.bullets[:]:
-            bullet_rect = bullet.get_rect()
-            for enemy in self.enemies[:]:
-                if bullet_rect.colliderect(enemy.get_rect()):
-                    if enemy in self.enemies:  # Extra check to prevent error
-                        self.enemies.remove(enemy)
-                        self.player.bullets.remove(bullet)
-                        self.score += 100
-                        break
+            enemy = self.formation.sweep(bullet.get_previous_rect(), bullet.get_rect())
+            if enemy:
+                self.formation.kill(enemy)
+                self.player.remove_bullet(bullet)
+                self.score += 100
 
         if not self.player.shield:  # Check enemy collisions only if not shielded
-            for enemy in self.enemies:
-                if enemy.get_rect().colliderect(self.player.get_rect()):
-                    self.game_over = True
+            if self.formation.collide(self.player.get_rect()):
+                self.game_over = True
 
     def check_win_condition(self):
         if not self.enemies:
             if self.level < 3:
                 self.level += 1
-                GameConfig.ENEMY_SPEED += 0.5
+                self.config = self.base_config.for_level(self.level)
                 self.setup_enemies()
             else:
                 self.win_condition = True
 
-    def draw(self):
-        self.screen.fill((0, 0, 20))
+    def pool_stats(self) -> dict:
+        return {
+            'bullets': self.bullet_pool.stats(),
+            'power_ups': self.power_up_pool.stats()
+        }
+
+    def render_text(self, text: str, color: Tuple[int, int, int]):
+        if self.sprites:
+            return self.sprites.render_text(text, color)
+        return self.font.render(text, True, color)
+
+    def step(self, actions: int = 0) -> int:
+        """Advance the simulation by one fixed timestep and return the score gained."""
+        score = self.score
+        self.frame += 1
+        self.bullet_pool.begin_frame()
+        self.power_up_pool.begin_frame()
+
+        if self.profiler:
+            self.step_profiled(actions)
+        else:
+            if not self.done:
+                self.handle_input(actions)
+                self.player.update()
+                self.update_enemies()
+                self.update_power_ups()
+                self.check_collisions()
+                self.check_win_condition()
+
+            if self.rendering:
+                self.draw()
+
+        if self.recorder:
+            self.recorder.record(self, actions)
+        return self.score - score
+
+    def start_recording(self, recorder):
+        """Feed every frame to recorder.record(game, actions) from now on; returns recorder."""
+        if self.frame:
+            raise RuntimeError("recording must start before the first frame")
+        self.recorder = recorder
+        return self.recorder
+
+    def state_hash(self) -> str:
+        """Digest of everything that affects future simulation, for replay verification."""
+        player = self.player
+        formation = self.formation
+        state = (
+            self.frame, self.score, self.level, self.game_over, self.win_condition,
+            player.x, player.y, player.speed, player.shoot_cooldown, player.power_up_timer,
+            player.current_power_up, player.double_shot, player.shield,
+            formation.x, formation.y, formation.speed, formation.direction, formation.alive,
+            [(bullet.x, bullet.y) for bullet in player.bullets],
+            [(power_up.x, power_up.y, power_up.type) for power_up in self.power_ups],
+            self.rng.getstate()
+        )
+        return hashlib.sha256(repr(state).encode()).hexdigest()
+
+    def step_profiled(self, actions: int):
+        clock = time.perf_counter
+        t0 = clock()
+        if not self.done:
+            self.handle_input(actions)
+            t1 = clock()
+            self.player.update()
+            t2 = clock()
+            self.update_enemies()
+            t3 = clock()
+            self.update_power_ups()
+            t4 = clock()
+            self.check_collisions()
+            t5 = clock()
+            self.check_win_condition()
+            t6 = clock()
+        else:
+            t1 = t2 = t3 = t4 = t5 = t6 = t0
+        if self.rendering:
+            self.draw()
+        t7 = clock()
+        self.profiler.record(
+            self.frame,
+            (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5, t7 - t6),
+            (len(self.enemies), len(self.player.bullets), len(self.power_ups))
+        )
+
+    def snapshot(self) -> FrameSnapshot:
+        player = self.player
+        formation = self.formation
+        return FrameSnapshot(
+            self.frame, self.score, self.level, self.game_over, self.win_condition,
+            PlayerView(player.x, player.y, player.shield, player.current_power_up, player.power_up_timer),
+            tuple(BulletView(bullet.x, bullet.y) for bullet in player.bullets),
+            FormationView(formation.x, formation.y, formation.animation_phase, tuple(formation.enemies)),
+            tuple(PowerUpView(power_up.x, power_up.y, power_up.type) for power_up in self.power_ups)
+        )
+
+    def draw(self, snapshot: FrameSnapshot = None):
+        if snapshot is None:
+            snapshot = self.snapshot()
+        if self.dirty_renderer:
+            self.dirty_renderer.begin_frame()
+            self.dirty_renderer.present(self.draw_scene(snapshot))
+        else:
+            self.screen.fill(self.config.BACKGROUND_COLOR)
+            self.draw_scene(snapshot)
+            pygame.display.flip()
+
+    def draw_scene(self, snapshot: FrameSnapshot) -> List[pygame.Rect]:
+        drawn = []
         
-        if self.win_condition:
-            win_text = self.font.render("Congratulations! You Won!", True, (0, 255, 0))
-            score_text = self.font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-            exit_text = self.font.render("Press ESC to exit", True, (255, 255, 255))
+        if snapshot.win_condition:
+            win_text = self.render_text("Congratulations! You Won!", (0, 255, 0))
+            score_text = self.render_text(f"Final Score: {snapshot.score}", (255, 255, 255))
+            exit_text = self.render_text("Press ESC to exit", (255, 255, 255))
             
-            center_x = GameConfig.SCREEN_WIDTH//2
-            self.screen.blit(win_text, (center_x - win_text.get_width()//2, 200))
-            self.screen.blit(score_text, (center_x - score_text.get_width()//2, 300))
-            self.screen.blit(exit_text, (center_x - exit_text.get_width()//2, 400))
-        elif self.game_over:
-            game_over_text = self.font.render("GAME OVER", True, (255, 0, 0))
-            score_text = self.font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-            exit_text = self.font.render("Press ESC to exit", True, (255, 255, 255))
+            center_x = self.config.SCREEN_WIDTH//2
+            drawn.append(self.screen.blit(win_text, (center_x - win_text.get_width()//2, 200)))
+            drawn.append(self.screen.blit(score_text, (center_x - score_text.get_width()//2, 300)))
+            drawn.append(self.screen.blit(exit_text, (center_x - exit_text.get_width()//2, 400)))
+        elif snapshot.game_over:
+            game_over_text = self.render_text("GAME OVER", (255, 0, 0))
+            score_text = self.render_text(f"Final Score: {snapshot.score}", (255, 255, 255))
+            exit_text = self.render_text("Press ESC to exit", (255, 255, 255))
             
-            center_x = GameConfig.SCREEN_WIDTH//2
-            self.screen.blit(game_over_text, (center_x - game_over_text.get_width()//2, 200))
-            self.screen.blit(score_text, (center_x - score_text.get_width()//2, 300))
-            self.screen.blit(exit_text, (center_x - exit_text.get_width()//2, 400))
+            center_x = self.config.SCREEN_WIDTH//2
+            drawn.append(self.screen.blit(game_over_text, (center_x - game_over_text.get_width()//2, 200)))
+            drawn.append(self.screen.blit(score_text, (center_x - score_text.get_width()//2, 300)))
+            drawn.append(self.screen.blit(exit_text, (center_x - exit_text.get_width()//2, 400)))
         else:
-            self.player.draw(self.screen)
-            for bullet in self.player.bullets:
-                bullet.draw(self.screen)
-            for enemy in self.enemies:
-                enemy.draw(self.screen)
-            for power_up in self.power_ups:
-                power_up.draw(self.screen)
+            player = snapshot.player
+            formation = snapshot.formation
+            sprites = self.sprites
+            if sprites:
+                sprites.draw_player(self.screen, player)
+                for bullet in snapshot.bullets:
+                    sprites.draw_bullet(self.screen, bullet)
+                sprites.draw_formation(self.screen, formation)
+                for power_up in snapshot.power_ups:
+                    sprites.draw_power_up(self.screen, power_up)
+            else:
+                Player.draw_shape(self.screen, player.x, player.y, Player.WIDTH, Player.HEIGHT, player.shield)
+                for bullet in snapshot.bullets:
+                    Bullet.draw_shape(self.screen, bullet.x, bullet.y, Bullet.WIDTH, Bullet.HEIGHT, Bullet.COLOR)
+                wave_offset = math.sin(formation.animation_phase) * 3
+                for enemy in formation.enemies:
+                    Enemy.draw_shape(self.screen, formation.x + enemy.local_x, formation.y + enemy.local_y,
+                                     enemy.color, wave_offset)
+                for power_up in snapshot.power_ups:
+                    pygame.draw.rect(self.screen, PowerUp.COLORS[power_up.type],
+                                     (power_up.x, power_up.y, PowerUp.WIDTH, PowerUp.HEIGHT))
+
+            if self.dirty_renderer:
+                drawn.append(Player.draw_rect_at(player.x, player.y))
+                drawn.extend(Bullet.draw_rect_at(bullet.x, bullet.y) for bullet in snapshot.bullets)
+                drawn.extend(Enemy.draw_rect_at(formation.x + enemy.local_x, formation.y + enemy.local_y)
+                             for enemy in formation.enemies)
+                drawn.extend(PowerUp.draw_rect_at(power_up.x, power_up.y) for power_up in snapshot.power_ups)
             
             # HUD
-            score_text = f"Score: {self.score}"
-            level_text = f"Level: {self.level}"
-            score_surface = self.font.render(score_text, True, (255, 255, 255))
-            level_surface = self.font.render(level_text, True, (255, 255, 255))
-            self.screen.blit(score_surface, (10, 10))
-            self.screen.blit(level_surface, (GameConfig.SCREEN_WIDTH - 120, 10))
+            score_text = f"Score: {snapshot.score}"
+            level_text = f"Level: {snapshot.level}"
+            score_surface = self.render_text(score_text, (255, 255, 255))
+            level_surface = self.render_text(level_text, (255, 255, 255))
+            drawn.append(self.screen.blit(score_surface, (10, 10)))
+            drawn.append(self.screen.blit(level_surface, (self.config.SCREEN_WIDTH - 120, 10)))
             
-            if self.player.current_power_up:
-                power_up_text = f"Power-up: {self.player.current_power_up.replace('_', ' ').title()} ({self.player.power_up_timer//60}s)"
-                power_up_surface = self.font.render(power_up_text, True, (255, 255, 255))
-                self.screen.blit(power_up_surface, (10, 50))
+            if player.current_power_up:
+                power_up_text = f"Power-up: {player.current_power_up.replace('_', ' ').title()} ({player.power_up_timer//60}s)"
+                power_up_surface = self.render_text(power_up_text, (255, 255, 255))
+                drawn.append(self.screen.blit(power_up_surface, (10, 50)))
+
+        if self.profiler and self.profiler.show_overlay:
+            drawn.append(self.profiler.draw_overlay(self.screen, self.profiler_font))
 
-        pygame.display.flip()
+        return drawn
 
-    def run(self):
+    def run(self, pipelined: bool = False, on_first_frame=None):
+        """Play until the window is closed. on_first_frame, if given, is called once the first frame is on screen."""
+        pipeline = PipelinedLoop(self) if pipelined else None
         running = True
         while running:
-            self.clock.tick(GameConfig.FPS)
+            self.clock.tick(self.config.FPS)
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -306,19 +1088,87 @@ class Game:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         running = False
+                    elif event.key == pygame.K_F3 and self.profiler:
+                        self.profiler.toggle_overlay()
 
-            if not self.game_over and not self.win_condition:
-                self.handle_input()
-                self.player.update()
-                self.update_enemies()
-                self.update_power_ups()
-                self.check_collisions()
-                self.check_win_condition()
-            
-            self.draw()
+            if pipeline:
+                pipeline.frame(self.read_keyboard())
+            else:
+                self.step(self.read_keyboard())
+            if on_first_frame:
+                on_first_frame()
+                on_first_frame = None
 
+        if pipeline:
+            pipeline.stop()
         pygame.quit()
 
+class PipelinedLoop:
+    """Simulates frame N+1 on a worker thread while frame N is drawn.
+
+    The worker hands back an immutable FrameSnapshot after each step and
+    the caller's thread (which owns the display) draws from the previous
+    one, so the two only ever share the snapshot. pygame releases the GIL
+    inside blits and display updates, letting Python-side simulation run
+    alongside them. Input reaches the screen one frame later than in the
+    sequential loop.
+    """
+
+    def __init__(self, game: Game):
+        if game.profiler:
+            raise ValueError("the profiler reads live game state and cannot run pipelined")
+        self.game = game
+        self.rendering = game.rendering
+        game.rendering = False  # the worker only simulates
+        self.inputs = queue.Queue(maxsize=1)
+        self.outputs = queue.Queue(maxsize=1)
+        self.snapshot = game.snapshot()
+        self.thread = threading.Thread(target=self.simulate, name="simulation", daemon=True)
+        self.thread.start()
+
+    def simulate(self):
+        while True:
+            actions = self.inputs.get()
+            if actions is None:
+                return
+            try:
+                # A callable (e.g. a bot) is evaluated here, against the state being simulated
+                if callable(actions):
+                    actions = actions(self.game)
+                self.game.step(actions)
+                self.outputs.put(self.game.snapshot())
+            except Exception as e:
+                self.outputs.put(e)
+                return
+
+    def frame(self, actions):
+        """Start simulating the next frame, draw the current one, then wait for the simulation."""
+        self.inputs.put(actions)
+        if self.rendering:
+            self.game.draw(self.snapshot)
+        result = self.outputs.get()
+        if isinstance(result, Exception):
+            raise result
+        self.snapshot = result
+
+    def stop(self):
+        self.inputs.put(None)
+        self.thread.join()
+        self.game.rendering = self.rendering
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Space Invaders")
+    parser.add_argument("--no-sprite-cache", action="store_true", help="draw entities with pygame.draw primitives every frame")
+    parser.add_argument("--dirty-rects", action="store_true", help="redraw and present only the changed screen regions")
+    parser.add_argument("--profile", action="store_true", help="time each frame phase; F3 toggles the overlay")
+    parser.add_argument("--trace", metavar="PATH", help="with --profile, write the frame trace to PATH (.csv or .json) on exit")
+    parser.add_argument("--pipelined", action="store_true", help="simulate the next frame on a worker thread while drawing the current one")
+    args = parser.parse_args()
+    if args.pipelined and args.profile:
+        parser.error("--profile cannot be combined with --pipelined")
+
+    config = GameConfig(USE_SPRITE_CACHE=not args.no_sprite_cache, DIRTY_RECTS=args.dirty_rects)
+    game = Game(config, profile=args.profile, trace=bool(args.trace))
+    game.run(pipelined=args.pipelined)
+    if game.profiler and args.trace:
+        game.profiler.export(args.trace)
\ No newline at end of file
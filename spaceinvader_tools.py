@@ -0,0 +1,371 @@
+import pygame
+import time
+import argparse
+import multiprocessing
+import json
+import base64
+import statistics
+from dataclasses import asdict, fields
+from typing import Dict, List
+from spaceinvader2 import (ACTION_FIRE, ACTION_LEFT, ACTION_RIGHT, FrameProfiler, Game, GameConfig, PipelinedLoop,
+                           SpriteCache)
+
+# Tooling around the Space Invaders game that playing it does not need: the game itself
+# stays in spaceinvader2.py and this module only drives it from outside.
+
+def simple_bot(game: Game) -> int:
+    """Track the lowest enemy's column and fire continuously."""
+    actions = ACTION_FIRE
+    if game.enemies:
+        target = max(game.enemies, key=lambda enemy: enemy.y)
+        # Bullets leave the gun at player.x + 55
+        gun_x = game.player.x + 55
+        enemy_x = target.x + target.width / 2
+        if gun_x < enemy_x - game.player.speed:
+            actions |= ACTION_RIGHT
+        elif gun_x > enemy_x + game.player.speed:
+            actions |= ACTION_LEFT
+    return actions
+
+def game_result(game: Game, seed) -> dict:
+    return {
+        'seed': seed,
+        'frames': game.frame,
+        'score': game.score,
+        'level': game.level,
+        'won': game.win_condition,
+        'game_over': game.game_over
+    }
+
+def play_headless_game(seed, bot=simple_bot, max_frames: int = 20000) -> dict:
+    game = Game(headless=True, render=False, seed=seed)
+    start = time.perf_counter()
+    while not game.done and game.frame < max_frames:
+        game.step(bot(game))
+    elapsed = time.perf_counter() - start
+    result = game_result(game, seed)
+    result['fps'] = game.frame / elapsed if elapsed else 0.0
+    return result
+
+def run_headless_games(seeds, workers=None, max_frames: int = 20000) -> List[dict]:
+    """Play one bot game per seed, spread across worker processes."""
+    if workers == 1:
+        return [play_headless_game(seed, max_frames=max_frames) for seed in seeds]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(play_headless_game, [(seed, simple_bot, max_frames) for seed in seeds])
+
+class SessionHost:
+    """Runs many isolated headless sessions side by side in one process.
+
+    Sessions share nothing but the (immutable) config, so they can be
+    opened, stepped and closed independently. Sessions without explicit
+    actions are driven by the host's bot.
+    """
+
+    def __init__(self, config: GameConfig = None, bot=simple_bot):
+        self.config = config or GameConfig()
+        self.bot = bot
+        self.sessions: Dict[int, Game] = {}
+        self.next_id = 0
+
+    def open_session(self, seed=None) -> int:
+        session_id = self.next_id
+        self.next_id += 1
+        self.sessions[session_id] = Game(self.config, headless=True, render=False, seed=seed)
+        return session_id
+
+    def close_session(self, session_id: int) -> dict:
+        game = self.sessions.pop(session_id)
+        return game_result(game, game.seed)
+
+    def step(self, actions: Dict[int, int] = None) -> int:
+        """Advance every unfinished session by one frame and return how many were stepped."""
+        actions = actions or {}
+        stepped = 0
+        for session_id, game in self.sessions.items():
+            if game.done:
+                continue
+            game.step(actions[session_id] if session_id in actions else self.bot(game))
+            stepped += 1
+        return stepped
+
+    def run(self, max_frames: int = 20000) -> List[dict]:
+        """Step until every session is finished or max_frames is reached, then close them all."""
+        for _ in range(max_frames):
+            if not self.step():
+                break
+        return [self.close_session(session_id) for session_id in list(self.sessions)]
+
+class InputRecording:
+    """A game's seed and config plus its per-frame input, packed three bits per frame.
+
+    State hashes are taken every CHECKPOINT_INTERVAL frames and at the end
+    so a replay can confirm it reproduced the game exactly.
+    """
+
+    VERSION = 1
+    BITS_PER_FRAME = 3
+    CHECKPOINT_INTERVAL = 600
+
+    def __init__(self, seed: int, config: GameConfig):
+        self.seed = seed
+        self.config = config
+        self.frames = 0
+        self.packed = bytearray()
+        self.checkpoints: Dict[int, str] = {}
+        self.score = None
+        self.state_hash = None
+
+    def append(self, actions: int):
+        bit = self.frames * self.BITS_PER_FRAME
+        byte, shift = divmod(bit, 8)
+        if len(self.packed) < byte + 2:
+            self.packed.extend(bytes(byte + 2 - len(self.packed)))
+        value = (actions & 7) << shift
+        self.packed[byte] |= value & 0xFF
+        self.packed[byte + 1] |= value >> 8
+        self.frames += 1
+
+    def record(self, game: Game, actions: int):
+        self.append(actions)
+        if game.frame % self.CHECKPOINT_INTERVAL == 0:
+            self.checkpoints[game.frame] = game.state_hash()
+
+    def finish(self, game: Game):
+        self.score = game.score
+        self.state_hash = game.state_hash()
+
+    def __iter__(self):
+        # Eight 3-bit frames fill exactly three bytes
+        data = bytes(self.packed) + bytes(3)
+        for first in range(0, self.frames, 8):
+            offset = first // 8 * 3
+            chunk = data[offset] | data[offset + 1] << 8 | data[offset + 2] << 16
+            for i in range(min(8, self.frames - first)):
+                yield (chunk >> (3 * i)) & 7
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({
+                'version': self.VERSION,
+                'seed': self.seed,
+                'config': asdict(self.config),
+                'frames': self.frames,
+                'inputs': base64.b64encode(bytes(self.packed[:(self.frames * 3 + 7) // 8])).decode('ascii'),
+                'checkpoints': self.checkpoints,
+                'score': self.score,
+                'state_hash': self.state_hash
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'InputRecording':
+        """Read a recording saved by save(); any malformed content raises ValueError."""
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("recording must be a JSON object")
+        missing = {'version', 'seed', 'config', 'frames', 'inputs', 'checkpoints', 'score', 'state_hash'} - data.keys()
+        if missing:
+            raise ValueError(f"recording is missing {', '.join(sorted(missing))}")
+        if data['version'] != cls.VERSION:
+            raise ValueError(f"unsupported recording version {data['version']!r}")
+        if not is_int(data['seed']):
+            raise ValueError(f"invalid seed {data['seed']!r}")
+        if not isinstance(data['config'], dict):
+            raise ValueError("config must be an object")
+        # JSON turns tuples into lists; put them back so the config compares equal
+        config = GameConfig(**{
+            field.name: tuple(data['config'][field.name]) if isinstance(data['config'][field.name], list)
+            else data['config'][field.name]
+            for field in fields(GameConfig) if field.name in data['config']
+        })
+        frames = data['frames']
+        if not is_int(frames) or frames < 0:
+            raise ValueError(f"invalid frame count {frames!r}")
+        if not isinstance(data['inputs'], str):
+            raise ValueError("inputs must be a base64 string")
+        packed = bytearray(base64.b64decode(data['inputs'], validate=True))
+        if len(packed) < (frames * cls.BITS_PER_FRAME + 7) // 8:
+            raise ValueError(f"input stream too short for {frames} frames")
+        checkpoints = data['checkpoints']
+        if not isinstance(checkpoints, dict):
+            raise ValueError("checkpoints must be an object")
+        if not all(frame.isdigit() and isinstance(digest, str) for frame, digest in checkpoints.items()):
+            raise ValueError("checkpoints must map integer frames to hash strings")
+        if not (data['score'] is None or is_int(data['score'])):
+            raise ValueError(f"invalid score {data['score']!r}")
+        if not (data['state_hash'] is None or isinstance(data['state_hash'], str)):
+            raise ValueError("state_hash must be a string")
+        recording = cls(data['seed'], config)
+        recording.frames = frames
+        recording.packed = packed
+        recording.checkpoints = {int(frame): digest for frame, digest in data['checkpoints'].items()}
+        recording.score = data['score']
+        recording.state_hash = data['state_hash']
+        return recording
+
+def is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def replay_recording(recording: InputRecording, config: GameConfig = None) -> dict:
+    """Re-simulate a recording headless and check it against its checkpoints, score and final hash.
+
+    The replay always runs under config (default GameConfig()), never the
+    config stored in the file, and a recording made under different rules
+    is rejected without being replayed.
+    """
+    config = config or GameConfig()
+    if not config.same_rules(recording.config):
+        return {'seed': recording.seed, 'frames': 0, 'score': None, 'verified': False,
+                'error': "recorded with non-standard game settings", 'fps': 0.0}
+    game = Game(config, headless=True, render=False, seed=recording.seed)
+    checkpoints = recording.checkpoints
+    error = None
+    start = time.perf_counter()
+    for actions in recording:
+        game.step(actions)
+        if game.frame in checkpoints and game.state_hash() != checkpoints[game.frame]:
+            error = f"state diverged by frame {game.frame}"
+            break
+    elapsed = time.perf_counter() - start
+    if error is None:
+        if game.score != recording.score:
+            error = f"score {game.score} does not match recorded {recording.score}"
+        elif game.state_hash() != recording.state_hash:
+            error = "final state hash does not match"
+    return {
+        'seed': recording.seed,
+        'frames': game.frame,
+        'score': game.score,
+        'verified': error is None,
+        'error': error,
+        'fps': game.frame / elapsed if elapsed else 0.0
+    }
+
+def verify_recording_file(path: str, config: GameConfig = None) -> dict:
+    try:
+        result = replay_recording(InputRecording.load(path), config)
+    except (OSError, ValueError) as e:
+        result = {'seed': None, 'frames': 0, 'score': None, 'verified': False, 'error': str(e), 'fps': 0.0}
+    result['path'] = path
+    return result
+
+def verify_recordings(paths, workers=None, config: GameConfig = None) -> List[dict]:
+    """Verify many recording files against config (default GameConfig()), spread across worker processes."""
+    if workers == 1:
+        return [verify_recording_file(path, config) for path in paths]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(verify_recording_file, [(path, config) for path in paths])
+
+def benchmark_pipeline(config: GameConfig = None, frames: int = 2000, seed: int = 0) -> dict:
+    """Frame time statistics in milliseconds for the sequential and pipelined loops.
+
+    Both runs play the same seeded bot game headless through the dummy video
+    driver with no frame cap, so each frame takes as long as its work.
+    """
+    results = {}
+    for label in ('sequential', 'pipelined'):
+        game = Game(config, headless=True, seed=seed)
+        pipeline = PipelinedLoop(game) if label == 'pipelined' else None
+        times = []
+        clock = time.perf_counter
+        previous = clock()
+        for _ in range(frames):
+            if pipeline:
+                pipeline.frame(simple_bot)
+            else:
+                game.step(simple_bot(game))
+            now = clock()
+            times.append((now - previous) * 1000)
+            previous = now
+        if pipeline:
+            pipeline.stop()
+        ordered = sorted(times)
+        results[label] = {
+            'mean': statistics.fmean(times),
+            'p50': FrameProfiler.percentile(ordered, 0.50),
+            'p95': FrameProfiler.percentile(ordered, 0.95),
+            'p99': FrameProfiler.percentile(ordered, 0.99),
+            'jitter': statistics.pstdev(times)
+        }
+    return results
+
+def benchmark_draw(game: Game, frames: int = 600) -> dict:
+    """Average draw() time in milliseconds with and without the sprite cache."""
+    cache = game.sprites or SpriteCache(game.font, game.config)
+    results = {}
+    for label, sprites in (('uncached', None), ('cached', cache)):
+        game.sprites = sprites
+        start = time.perf_counter()
+        for _ in range(frames):
+            game.draw()
+        results[label] = (time.perf_counter() - start) * 1000 / frames
+    game.sprites = cache if game.config.USE_SPRITE_CACHE else None
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Space Invaders headless runs, recordings and benchmarks")
+    parser.add_argument("--no-sprite-cache", action="store_true", help="draw entities with pygame.draw primitives every frame")
+    parser.add_argument("--dirty-rects", action="store_true", help="redraw and present only the changed screen regions")
+    parser.add_argument("--headless", type=int, metavar="GAMES", help="play GAMES bot games without a window and print their results")
+    parser.add_argument("--seed", type=int, default=0, help="first RNG seed for --headless games")
+    parser.add_argument("--max-frames", type=int, default=20000, help="frame limit per --headless game")
+    parser.add_argument("--host", type=int, metavar="SESSIONS", help="run SESSIONS headless bot games together in this process")
+    parser.add_argument("--workers", type=int, help="worker processes for --headless (default: one per CPU)")
+    parser.add_argument("--record", metavar="PATH", help="play a game in a window and record its seed and input to PATH")
+    parser.add_argument("--pipelined", action="store_true", help="with --record, simulate the next frame on a worker thread")
+    parser.add_argument("--replay", nargs="+", metavar="PATH", help="verify recordings headless and report each result")
+    parser.add_argument("--bench-pipeline", type=int, metavar="FRAMES", help="report frame time and jitter with the pipeline off and on, then exit")
+    parser.add_argument("--bench-draw", type=int, metavar="FRAMES", help="report per-frame draw time with and without the sprite cache, then exit")
+    args = parser.parse_args()
+
+    config = GameConfig(USE_SPRITE_CACHE=not args.no_sprite_cache, DIRTY_RECTS=args.dirty_rects)
+    if args.host:
+        host = SessionHost(config)
+        for seed in range(args.seed, args.seed + args.host):
+            host.open_session(seed)
+        start = time.perf_counter()
+        results = host.run(args.max_frames)
+        elapsed = time.perf_counter() - start
+        total_frames = sum(result['frames'] for result in results)
+        wins = sum(result['won'] for result in results)
+        print(f"{len(results)} sessions ({wins} won), {total_frames} frames in {elapsed:.2f}s "
+              f"({total_frames / elapsed:.0f} fps aggregate)")
+    elif args.headless:
+        start = time.perf_counter()
+        results = run_headless_games(range(args.seed, args.seed + args.headless), args.workers, args.max_frames)
+        elapsed = time.perf_counter() - start
+        for result in results:
+            print(f"seed {result['seed']}: score {result['score']} level {result['level']} "
+                  f"frames {result['frames']} ({result['fps']:.0f} fps)")
+        total_frames = sum(result['frames'] for result in results)
+        print(f"{len(results)} games, {total_frames} frames in {elapsed:.2f}s ({total_frames / elapsed:.0f} fps aggregate)")
+    elif args.replay:
+        start = time.perf_counter()
+        results = verify_recordings(args.replay, args.workers)
+        elapsed = time.perf_counter() - start
+        for result in results:
+            status = "ok" if result['verified'] else f"FAILED: {result['error']}"
+            print(f"{result['path']}: score {result['score']} frames {result['frames']} "
+                  f"({result['fps']:.0f} fps) {status}")
+        total_frames = sum(result['frames'] for result in results)
+        verified = sum(result['verified'] for result in results)
+        print(f"{verified}/{len(results)} verified, {total_frames} frames in {elapsed:.2f}s")
+    elif args.bench_pipeline:
+        for label, stats in benchmark_pipeline(config, args.bench_pipeline, args.seed).items():
+            print(f"{label:>10}: mean {stats['mean']:.3f} ms  p50 {stats['p50']:.3f}  p95 {stats['p95']:.3f}  "
+                  f"p99 {stats['p99']:.3f}  jitter (stdev) {stats['jitter']:.3f} ms")
+        pygame.quit()
+    elif args.bench_draw:
+        game = Game(config)
+        for label, ms in benchmark_draw(game, args.bench_draw).items():
+            print(f"{label:>8}: {ms:.3f} ms/frame")
+        pygame.quit()
+    elif args.record:
+        game = Game(config)
+        recording = game.start_recording(InputRecording(game.seed, game.base_config))
+        game.run(pipelined=args.pipelined)
+        recording.finish(game)
+        recording.save(args.record)
+    else:
+        parser.print_help()
\ No newline at end of file